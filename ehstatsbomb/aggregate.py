@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import as_completed
+import pandas as pd
+from .loader import _make_executor
+from .network import NETWORK_COLUMNS, pass_counts
+
+# How each partial column is combined when two partial aggregates are merged
+_MERGE = {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}
+
+
+class AggSpec:
+    """
+    Declarative description of an aggregate that is computed per match and merged across matches
+    name = key of the result
+    by = list of columns to group on e.g. ['team_id','player_id']
+    values = dictionary of output column: (source column, how), how can be 'sum', 'count', 'min', 'max' or 'mean'
+    event_types (optional) = only aggregate events of these types
+    query (optional) = pandas query string applied to the events first e.g. "shot_outcome_name == 'Goal'"
+    func (optional) = function(events) -> dataframe, applied before grouping (must be a module level function for process pools)
+    columns (optional) = event columns the spec reads, so only those are loaded (worked out from by/values when there's no query/func)
+    """
+    def __init__(self, name, by, values, event_types=None, query=None, func=None, columns=None):
+        for out, (col, how) in values.items():
+            assert how in ['sum','count','min','max','mean'], f"Invalid how for {out}: {how}"
+
+        self.name = name
+        self.by = list(by)
+        self.values = dict(values)
+        self.event_types = event_types
+        self.query = query
+        self.func = func
+
+        if columns is None and query is None and func is None:
+            columns = ['type_name'] + self.by + [col for col, how in self.values.values()]
+        self.columns = columns
+
+    def __repr__(self):
+        return f'AggSpec({self.name!r}, by={self.by}, values={self.values})'
+
+    def _partial_columns(self):
+        """
+        Partial columns and how to merge them, a mean is carried as a sum and a count
+        """
+        columns = {}
+
+        for out, (col, how) in self.values.items():
+            if how == 'mean':
+                columns[out + '__sum'] = (col, 'sum')
+                columns[out + '__count'] = (col, 'count')
+            else:
+                columns[out] = (col, how)
+
+        return columns
+
+    def map(self, events):
+        """
+        Compute the partial aggregate of one match, indexed by the by columns
+        """
+        if self.event_types is not None:
+            events = events[events['type_name'].isin(self.event_types)]
+
+        if self.query is not None:
+            events = events.query(self.query)
+
+        if self.func is not None:
+            events = self.func(events)
+
+        return events.groupby(self.by, observed=True).agg(**self._partial_columns())
+
+    def merge(self, left, right):
+        """
+        Combine two partial aggregates, this is associative so partials can be merged in any order
+        """
+        if left is None:
+            return right
+
+        hows = {col: _MERGE[how] for col, (_, how) in self._partial_columns().items()}
+
+        return pd.concat([left, right]).groupby(level=list(range(len(self.by))), observed=True).agg(hows)
+
+    def finalize(self, partial):
+        """
+        Turn the merged partial aggregate into the result dataframe
+        """
+        result = pd.DataFrame(index=partial.index)
+
+        for out, (col, how) in self.values.items():
+            if how == 'mean':
+                result[out] = partial[out + '__sum'] / partial[out + '__count']
+            else:
+                result[out] = partial[out]
+
+        return result.reset_index()
+
+
+BUILTIN_AGGREGATES = {
+    'pass_pairs': AggSpec('pass_pairs', by=['team_id','player_id','pass_recipient_id'], values={'passes': ('count','sum')},
+                          event_types=['Pass'], func=pass_counts, columns=NETWORK_COLUMNS),
+    'shots_xg': AggSpec('shots_xg', by=['team_id','player_id','player_name'],
+                        values={'shots': ('type_name','count'), 'xg': ('shot_statsbomb_xg','sum')}, event_types=['Shot']),
+    'events_per_type': AggSpec('events_per_type', by=['team_id','team_name','type_name'], values={'events': ('type_name','count')}),
+}
+
+
+def resolve_specs(specs):
+    """
+    Accept AggSpecs or the names of built-in aggregates
+    """
+    resolved = []
+
+    for spec in specs:
+        if isinstance(spec, str):
+            assert spec in BUILTIN_AGGREGATES, f"Unknown aggregate: {spec}"
+            spec = BUILTIN_AGGREGATES[spec]
+        resolved.append(spec)
+
+    return resolved
+
+
+def load_filters(specs):
+    """
+    The event types and columns that need loading to answer every spec (None = everything)
+    """
+    event_types, columns = set(), set()
+
+    for spec in specs:
+        event_types = None if event_types is None or spec.event_types is None else event_types | set(spec.event_types)
+        columns = None if columns is None or spec.columns is None else columns | set(spec.columns)
+
+    return (sorted(event_types) if event_types is not None else None,
+            sorted(columns) if columns is not None else None)
+
+
+def map_events(specs, events):
+    return {spec.name: spec.map(events) for spec in specs}
+
+
+def map_file(specs, event_types, columns, compact, file_path):
+    """
+    Process pool entry point, load one match file and return its partial aggregates
+    """
+    from .ehsb import MyClass
+
+    events = MyClass._open_json_file(file_path, event_types=event_types, columns=columns, compact=compact)
+
+    return map_events(specs, events)
+
+
+def run_aggregates(map_func, items, specs, workers=None, executor='thread', progress=None):
+    """
+    Run map_func(item) -> {name: partial} across a pool and merge the partials as they complete
+    Only the running merged partials (and those of matches in flight) are held in memory
+    """
+    merged = {spec.name: None for spec in specs}
+    total = len(items)
+    workers = workers or os.cpu_count() or 1
+
+    def merge(partials):
+        for spec in specs:
+            merged[spec.name] = spec.merge(merged[spec.name], partials[spec.name])
+
+    if workers == 1 or total <= 1:
+        for done, item in enumerate(items, start=1):
+            merge(map_func(item))
+            if progress is not None:
+                progress(done, total, item)
+    else:
+        with _make_executor(executor, min(workers, total)) as pool:
+            futures = {pool.submit(map_func, item): item for item in items}
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                item = futures.pop(future)
+                merge(future.result())
+                if progress is not None:
+                    progress(done, total, item)
+
+    return {spec.name: spec.finalize(merged[spec.name]) if merged[spec.name] is not None else None for spec in specs}
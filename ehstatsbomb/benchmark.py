@@ -0,0 +1,284 @@
+"""
+Benchmarks of the main MyClass entry points on synthetic StatsBomb-style data
+
+Run from the command line, results are written as json so runs of different versions can be compared later:
+    python -m ehstatsbomb.benchmark --matches 50 --events 3000 --out results.json
+    python -m ehstatsbomb.benchmark --matches 50 --compare results.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .synthetic import generate_dataset
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BENCHMARKS = ['get_all_match_info', 'get_specific_match', 'get_team_event_data', 'get_avg_positions',
+              'get_passing_networks', 'aggregate', 'render_match_plots']
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+        return version('ehstatsbomb')
+    except Exception:
+        return None
+
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process so far in MB (None where the resource module is not available e.g. Windows)
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024**2 if sys.platform == 'darwin' else 1024), 1)
+
+
+def current_rss_mb():
+    """
+    Resident memory of this process right now in MB (None when /proc is not available)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024**2, 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _new_instance(root, options):
+    """
+    A MyClass with cold caches and match info loaded, so each benchmark starts from the same state
+    """
+    from .ehsb import MyClass
+
+    sb = MyClass(**options)
+    sb.get_all_match_info(root + 'matches/')
+
+    return sb
+
+
+def _busiest_team(sb):
+    counts = pd.concat([sb._match_info_df['home_team_name'], sb._match_info_df['away_team_name']]).value_counts()
+    return counts.index[0]
+
+
+def _cases(root, options, out_dir):
+    """
+    Every benchmark as name: function(sb) returning (items processed, unit)
+    """
+    def match_ids(sb):
+        return sb._match_info_df['match_id'].tolist()
+
+    def all_match_info(sb):
+        from .ehsb import MyClass
+        info = MyClass(**options).get_all_match_info(root + 'matches/')
+        return len(info), 'matches'
+
+    def specific_match(sb):
+        return sum(len(sb.get_specific_match(m)) for m in match_ids(sb)), 'events'
+
+    def team_event_data(sb):
+        return len(sb.get_team_event_data(_busiest_team(sb), 'name')), 'events'
+
+    def avg_positions(sb):
+        for m in match_ids(sb):
+            sb.get_avg_positions(m)
+        return len(match_ids(sb)), 'matches'
+
+    def passing_networks(sb):
+        return len(sb.get_passing_networks(match_ids(sb))), 'matches'
+
+    def aggregate(sb):
+        sb.aggregate(['pass_pairs','shots_xg','events_per_type'])
+        return len(match_ids(sb)), 'matches'
+
+    def render(sb):
+        return len(sb.render_match_plots(match_ids(sb), out_dir, kind='passing', fmt='png', executor='thread')), 'matches'
+
+    return {'get_all_match_info': all_match_info,
+            'get_specific_match': specific_match,
+            'get_team_event_data': team_event_data,
+            'get_avg_positions': avg_positions,
+            'get_passing_networks': passing_networks,
+            'aggregate': aggregate,
+            'render_match_plots': render}
+
+
+def _highest(values):
+    values = [v for v in values if v is not None]
+    return max(values) if values else None
+
+
+def _run_case(name, root, options, out_dir, warm_disk_cache=False):
+    """
+    Run one benchmark once, in a process of its own so the peak RSS belongs to this benchmark alone
+    With a cache_dir the disk cache is cleared first (and filled again untimed when warm_disk_cache is True)
+    """
+    from .ehsb import MyClass
+
+    if options['cache_dir'] is not None:
+        sb = MyClass(**options)
+        sb.clear_cache()
+        if warm_disk_cache:
+            sb.get_all_match_info(root + 'matches/')
+            sb.warm_cache()
+
+    sb = _new_instance(root, options)
+    rss_start = current_rss_mb()
+
+    start = time.perf_counter()
+    items, unit = _cases(root, options, out_dir)[name](sb)
+    seconds = time.perf_counter() - start
+
+    peak = peak_rss_mb()
+
+    return {'seconds': seconds, 'items': items, 'unit': unit, 'rss_start_mb': rss_start, 'peak_rss_mb': peak,
+            'peak_rss_increase_mb': round(max(peak - rss_start, 0), 1) if peak is not None and rss_start is not None else None}
+
+
+def run_benchmarks(data_dir=None, matches=20, events_per_match=3000, competitions=1, teams=8, seed=0, benchmarks=None,
+                   repeat=1, workers=None, executor='thread', compact=False, cache_dir=None, warm_disk_cache=False, progress=None):
+    """
+    Generate synthetic data (unless data_dir already holds matches/ and events/) and time each benchmark
+    benchmarks (optional) = names from BENCHMARKS, otherwise all of them
+    repeat = times each benchmark is run, every run is in a new process with a fresh MyClass so the in-memory cache is cold
+    and peak_rss_mb is that benchmark's own (peak_rss_increase_mb is the part above the process's memory at the start of the run)
+    workers/executor/compact/cache_dir are passed to MyClass, cache_dir is cleared before every run
+    warm_disk_cache = True fills cache_dir (untimed) before every run instead, to time loading from the disk cache
+    progress (optional) is called as progress(done, total, name) after each benchmark
+    Returns a json-serialisable dictionary of the environment, the config and one result per benchmark
+    """
+    benchmarks = benchmarks or BENCHMARKS
+    for name in benchmarks:
+        assert name in BENCHMARKS, f"Unknown benchmark: {name}"
+
+    tmp = tempfile.TemporaryDirectory()
+
+    if data_dir is None:
+        data_dir = os.path.join(tmp.name, 'data')
+
+    if data_dir[-1] != '/':
+        data_dir = data_dir + '/'
+
+    generated = None
+    if not os.path.exists(data_dir + 'matches/'):
+        start = time.perf_counter()
+        generate_dataset(data_dir, matches=matches, events_per_match=events_per_match, competitions=competitions,
+                         teams=teams, seed=seed)
+        generated = round(time.perf_counter() - start, 4)
+
+    options = {'workers': workers, 'executor': executor, 'compact': compact, 'cache_dir': cache_dir}
+
+    out_dir = os.path.join(tmp.name, 'plots')
+    results = []
+
+    try:
+        for done, name in enumerate(benchmarks, start=1):
+            runs = []
+
+            for _ in range(repeat):
+                # A new process per run, peak RSS never goes down within a process
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                    runs.append(pool.submit(_run_case, name, data_dir, options, out_dir, warm_disk_cache).result())
+
+            times = [run['seconds'] for run in runs]
+
+            results.append({'name': name,
+                            'wall_s': round(min(times), 4),
+                            'wall_s_mean': round(float(np.mean(times)), 4),
+                            'runs': repeat,
+                            'items': int(runs[0]['items']),
+                            'unit': runs[0]['unit'],
+                            'throughput': round(runs[0]['items'] / min(times), 2) if min(times) > 0 else None,
+                            'rss_start_mb': runs[0]['rss_start_mb'],
+                            'peak_rss_mb': _highest(run['peak_rss_mb'] for run in runs),
+                            'peak_rss_increase_mb': _highest(run['peak_rss_increase_mb'] for run in runs)})
+
+            if progress is not None:
+                progress(done, len(benchmarks), name)
+    finally:
+        tmp.cleanup()
+
+    return {'version': _version(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'config': {'matches': matches, 'events_per_match': events_per_match, 'competitions': competitions, 'teams': teams,
+                       'seed': seed, 'repeat': repeat, 'workers': workers, 'executor': executor, 'compact': compact,
+                       'cache_dir': cache_dir is not None, 'disk_cache': None if cache_dir is None else 'warm' if warm_disk_cache else 'cold',
+                       'generate_s': generated},
+            'results': results}
+
+
+def compare_results(before, after):
+    """
+    Compare two run_benchmarks results (dictionaries or json file paths)
+    Returns a dataframe per benchmark of the wall times, peak RSS increases and the ratio after/before (above 1 = slower)
+    """
+    runs = []
+    for run in [before, after]:
+        if isinstance(run, str):
+            with open(run, encoding='utf-8') as f:
+                run = json.load(f)
+        runs.append(pd.DataFrame(run['results']).set_index('name').reindex(columns=['wall_s','peak_rss_increase_mb']))
+
+    df = runs[0].join(runs[1], lsuffix='_before', rsuffix='_after', how='outer')
+    df['ratio'] = df['wall_s_after'] / df['wall_s_before']
+
+    return df.reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark ehstatsbomb on synthetic StatsBomb data')
+    parser.add_argument('--matches', type=int, default=20, help='matches per competition')
+    parser.add_argument('--events', type=int, default=3000, help='events per match')
+    parser.add_argument('--competitions', type=int, default=1)
+    parser.add_argument('--teams', type=int, default=8, help='teams per competition')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help='use (or generate once into) this folder instead of a temporary one')
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--executor', choices=['thread','process'], default='thread')
+    parser.add_argument('--compact', action='store_true')
+    parser.add_argument('--cache-dir', help='cleared before every run')
+    parser.add_argument('--warm-disk-cache', action='store_true', help='fill --cache-dir before every run instead of clearing it')
+    parser.add_argument('--out', help='write the results json here instead of stdout')
+    parser.add_argument('--compare', help='results json of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(data_dir=args.data_dir, matches=args.matches, events_per_match=args.events,
+                             competitions=args.competitions, teams=args.teams, seed=args.seed, benchmarks=args.benchmarks,
+                             repeat=args.repeat, workers=args.workers, executor=args.executor, compact=args.compact,
+                             cache_dir=args.cache_dir, warm_disk_cache=args.warm_disk_cache,
+                             progress=lambda done, total, name: print(f'{done}/{total} {name}', file=sys.stderr))
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        print(compare_results(args.compare, results).to_string(index=False), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+class DiskCache:
+    """
+    Stores normalized event dataframes on disk so each match file is only parsed once
+    Entries are keyed by the source file path plus its mtime and size, a changed source file invalidates its entry
+    Each source file gets a folder of its own (cache_dir/<hash of the path>/<mtime>-<size>.parquet) so looking after
+    one entry never lists the whole cache
+    Parquet is used when pyarrow is installed, otherwise entries fall back to pickle
+    tag (optional) keeps differently shaped versions of the same file apart e.g. tag='compact'
+    """
+    def __init__(self, cache_dir, tag=None):
+        if cache_dir[-1] != '/':
+            cache_dir = cache_dir + '/'
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.tag = tag
+
+    def _prefix(self, source_path):
+        name = os.path.abspath(source_path) + ('|' + self.tag if self.tag else '')
+        return hashlib.sha1(name.encode('utf-8')).hexdigest()[:20]
+
+    def _entry_dir(self, source_path):
+        return self.cache_dir + self._prefix(source_path) + '/'
+
+    def _key(self, source_path):
+        st = os.stat(source_path)
+        return f'{st.st_mtime_ns}-{st.st_size}'
+
+    @staticmethod
+    def _data_files(entry_dir):
+        """
+        List the data files held for one source path
+        """
+        try:
+            return [f for f in os.listdir(entry_dir) if f.endswith(('.parquet', '.pkl'))]
+        except FileNotFoundError:
+            return []
+
+    def _entry_dirs(self):
+        return [self.cache_dir + name + '/' for name in os.listdir(self.cache_dir)
+                if len(name) == 20 and all(c in '0123456789abcdef' for c in name) and os.path.isdir(self.cache_dir + name)]
+
+    def _remove_stale(self, entry_dir, keep=None):
+        for filename in self._data_files(entry_dir):
+            if filename != keep:
+                try:
+                    os.remove(entry_dir + filename)
+                except FileNotFoundError:
+                    # Another process sharing the cache got there first
+                    pass
+
+    def get(self, source_path):
+        """
+        Return the cached dataframe for source_path, or None if there is no fresh entry
+        """
+        entry_dir = self._entry_dir(source_path)
+        key = self._key(source_path)
+
+        for ext in ['.parquet', '.pkl']:
+            file_path = entry_dir + key + ext
+            if os.path.exists(file_path):
+                if ext == '.parquet':
+                    return restore_lists(pd.read_parquet(file_path))
+                return pd.read_pickle(file_path)
+
+        # Anything left for this source belongs to an older version of the file
+        self._remove_stale(entry_dir)
+
+        return None
+
+    @staticmethod
+    def _write(entry_dir, filename, write):
+        """
+        Write a file through a temporary file of its own, so processes sharing the cache never write to the same file
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=entry_dir, suffix='.tmp')
+        os.close(fd)
+
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, entry_dir + filename)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def put(self, source_path, df):
+        """
+        Write df as the entry for source_path, replacing any stale entries
+        """
+        entry_dir = self._entry_dir(source_path)
+        key = self._key(source_path)
+
+        os.makedirs(entry_dir, exist_ok=True)
+
+        try:
+            self._write(entry_dir, key + '.parquet', lambda tmp_path: df.to_parquet(tmp_path, index=False))
+            filename = key + '.parquet'
+        except Exception:
+            # pyarrow missing, or a column it can't represent (e.g. mixed nested types)
+            self._write(entry_dir, key + '.pkl', lambda tmp_path: df.to_pickle(tmp_path, compression=None))
+            filename = key + '.pkl'
+
+        if not os.path.exists(entry_dir + 'source'):
+            def write_source(tmp_path):
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(os.path.abspath(source_path))
+
+            self._write(entry_dir, 'source', write_source)
+
+        self._remove_stale(entry_dir, keep=filename)
+
+    def clear(self):
+        """
+        Delete every entry in the cache
+        """
+        for entry_dir in self._entry_dirs():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def info(self):
+        """
+        Return a dataframe describing each cache entry, its source file, size on disk and whether it is stale
+        """
+        rows = []
+
+        for entry_dir in self._entry_dirs():
+            src_file = entry_dir + 'source'
+            source = open(src_file, encoding='utf-8').read() if os.path.exists(src_file) else None
+
+            for filename in self._data_files(entry_dir):
+                mtime_ns, size = os.path.splitext(filename)[0].split('-')
+
+                stale = source is None or not os.path.exists(source)
+                if not stale:
+                    st = os.stat(source)
+                    stale = (st.st_mtime_ns, st.st_size) != (int(mtime_ns), int(size))
+
+                rows.append({'source': source,
+                             'entry': os.path.basename(entry_dir[:-1]) + '/' + filename,
+                             'format': os.path.splitext(filename)[1][1:],
+                             'bytes': os.path.getsize(entry_dir + filename),
+                             'stale': stale})
+
+        return pd.DataFrame(rows, columns=['source', 'entry', 'format', 'bytes', 'stale'])
+
+
+def restore_lists(df, nan=True):
+    """
+    Parquet hands nested fields back as numpy arrays and missing values in object columns as None,
+    turn them back into what json_normalize produced (lists and NaN)
+    nan = False leaves missing values in columns without lists as None, for tables where the json holds explicit nulls
+    """
+    for col in df.columns[df.dtypes == object]:
+        first = df[col].dropna()
+        if len(first) and isinstance(first.iloc[0], np.ndarray):
+            df[col] = df[col].map(lambda v: _to_list(v) if isinstance(v, np.ndarray) else (np.nan if v is None else v))
+        elif nan and df[col].isna().any():
+            df[col] = df[col].astype(object).where(df[col].notna(), np.nan)
+
+    return df
+
+
+def _copy_nested(value):
+    if isinstance(value, list):
+        return [_copy_nested(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _copy_nested(v) for k, v in value.items()}
+    return value
+
+
+def nested_columns(df):
+    """
+    The object columns of df that hold lists or dictionaries e.g. location, pass_end_location, tactics_lineup
+    """
+    columns = []
+
+    for col in df.columns[df.dtypes == object]:
+        values = df[col].dropna()
+        if len(values) and isinstance(values.iloc[0], (list, dict)):
+            columns.append(col)
+
+    return columns
+
+
+def deep_copy(df, columns=None):
+    """
+    Copy df including the lists and dictionaries inside its nested columns, which DataFrame.copy() leaves shared
+    columns (optional) = the nested columns if already known, otherwise they are looked for
+    """
+    df = df.copy()
+
+    for col in nested_columns(df) if columns is None else columns:
+        df[col] = df[col].map(_copy_nested)
+
+    return df
+
+
+class MatchCache:
+    """
+    Bounded in-memory LRU cache of parsed matches, shared by every method that loads event data
+    Limited by number of entries and (optionally) total bytes, frames are deep copied on the way in and out so callers can't corrupt them
+    """
+    def __init__(self, max_entries=16, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._nested = {}
+        self._lock = threading.Lock()
+
+    def get(self, *keys):
+        """
+        Return (key, copy of the cached dataframe) for the first of keys that is cached, or (None, None) on a miss
+        A lookup counts as a single hit or miss however many keys are tried
+        """
+        with self._lock:
+            for key in keys:
+                df = self._entries.get(key)
+
+                if df is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    nested = self._nested[key]
+                    break
+            else:
+                self.misses += 1
+                return None, None
+
+        return key, deep_copy(df, nested)
+
+    def put(self, key, df):
+        """
+        Store a copy of df under key, evicting the least recently used entries to stay within the limits
+        """
+        if not self.max_entries:
+            return
+
+        # Deep sizing walks every object cell, only pay for it when there is a byte limit
+        size = int(df.memory_usage(index=True, deep=self.max_bytes is not None).sum())
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        nested = nested_columns(df)
+        df = deep_copy(df, nested)
+
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._sizes.pop(key)
+                del self._entries[key]
+
+            self._entries[key] = df
+            self._sizes[key] = size
+            self._nested[key] = nested
+            self.bytes += size
+
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                old_key, _ = self._entries.popitem(last=False)
+                self.bytes -= self._sizes.pop(old_key)
+                del self._nested[old_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._nested.clear()
+            self.bytes = 0
+
+    def info(self):
+        """
+        Return a dictionary of hit/miss counters and current usage
+        """
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'entries': len(self._entries),
+                    'bytes': self.bytes,
+                    'max_entries': self.max_entries,
+                    'max_bytes': self.max_bytes}
+
+
+def _to_list(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype != object:
+            return value.tolist()
+        return [_to_list(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_list(v) for k, v in value.items()}
+    return value
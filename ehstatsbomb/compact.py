@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+def is_coordinate_column(col):
+    return col == 'location' or col.endswith('_location')
+
+
+def split_coordinates(values):
+    """
+    Turn a series of [x, y] / [x, y, z] lists (NaN where missing) into an n x 3 float32 array
+    """
+    coords = np.full((len(values), 3), np.nan, dtype=np.float32)
+
+    for i, v in enumerate(values):
+        if isinstance(v, (list, tuple, np.ndarray)) and len(v):
+            coords[i, :len(v)] = v[:3]
+
+    return coords
+
+
+def compact_events(df, category_ratio=0.5):
+    """
+    Shrink a flattened event dataframe:
+    location style list columns become float32 <col>_x, <col>_y (and <col>_z where present) columns,
+    repeated strings (team_name, type_name, player_name etc.) become categoricals,
+    *_id columns become nullable integers and True/NaN flags become nullable booleans
+    category_ratio = max unique values per row for a string column to be stored as a categorical
+    """
+    columns = {}
+
+    for col in df.columns:
+        values = df[col]
+
+        if values.dtype == object and is_coordinate_column(col):
+            coords = split_coordinates(values)
+            columns[col + '_x'] = coords[:, 0]
+            columns[col + '_y'] = coords[:, 1]
+            if not np.isnan(coords[:, 2]).all():
+                columns[col + '_z'] = coords[:, 2]
+            continue
+
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+
+        if col.endswith('_id') and kind in ['integer', 'floating', 'mixed-integer-float']:
+            ids = pd.to_numeric(values)
+            if (ids.dropna() % 1 == 0).all():
+                size = 'Int32' if ids.abs().max() < 2**31 else 'Int64'
+                values = ids.astype(size)
+
+        elif kind == 'string' and values.nunique() <= category_ratio * len(values):
+            values = values.astype('category')
+
+        elif kind == 'boolean':
+            values = values.astype('boolean')
+
+        columns[col] = values
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+def expand_columns(df, columns):
+    """
+    Map requested column names onto a compact frame, where e.g. location is held as location_x/location_y
+    """
+    expanded = []
+
+    for col in columns:
+        if col not in df.columns and col + '_x' in df.columns:
+            expanded += [c for c in [col + '_x', col + '_y', col + '_z'] if c in df.columns]
+        else:
+            expanded.append(col)
+
+    return expanded
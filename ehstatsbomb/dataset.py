@@ -0,0 +1,240 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from .compact import compact_events
+
+INDEX_FILE = '_index.json'
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("Event datasets need pyarrow, pip install pyarrow")
+
+    return pyarrow
+
+
+def _json_cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value
+
+
+def to_arrow(events, match_id):
+    """
+    Turn one match's event dataframe into an Arrow table with a stable, flat schema
+    Coordinates become float32 x/y(/z) columns, categoricals are stored as plain strings and any other nested field as a json string
+    """
+    pa = _pyarrow()
+
+    df = compact_events(events)
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+        elif df[col].dtype == object:
+            df[col] = df[col].map(_json_cell)
+
+    df.insert(0, 'match_id', np.int32(match_id))
+
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _summary(events, match_id, competition_id, season_id, file):
+    """
+    What a dataset file holds, so queries can skip files without opening them
+    """
+    def values(col):
+        return sorted({v.item() if hasattr(v, 'item') else v for v in events[col].dropna().unique()}) if col in events.columns else []
+
+    return {'file': file,
+            'match_id': int(match_id),
+            'competition_id': None if pd.isnull(competition_id) else int(competition_id),
+            'season_id': None if pd.isnull(season_id) else int(season_id),
+            'team_id': values('team_id'),
+            'team_name': values('team_name'),
+            'type_name': values('type_name'),
+            'player_id': values('player_id'),
+            'player_name': values('player_name'),
+            'minute_min': int(events['minute'].min()) if len(events) else None,
+            'minute_max': int(events['minute'].max()) if len(events) else None}
+
+
+def build_event_dataset(sb, out_dir, match_ids=None, path=None, overwrite=False, progress=None):
+    """
+    Convert event files into an Arrow IPC dataset partitioned as out_dir/competition_id=<id>/season_id=<id>/<match_id>.arrow
+    sb = MyClass with match info loaded (get_all_match_info), used for the partitions and to load the events
+    overwrite = False skips matches already in the dataset
+    Returns an EventDataset over out_dir
+    """
+    pa = _pyarrow()
+
+    assert sb._match_info_df is not None, "Match info dataframe not found, please run get_all_match_info"
+
+    if out_dir[-1] != '/':
+        out_dir = out_dir + '/'
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    index = _read_index(out_dir)
+    info = sb._match_info_df.drop_duplicates('match_id').set_index('match_id')
+
+    if match_ids is None:
+        match_ids = info.index.tolist()
+
+    if not overwrite:
+        match_ids = [m for m in match_ids if str(m) not in index]
+
+    for done, (match_id, events) in enumerate(sb.iter_matches(match_ids, path=path), start=1):
+        competition_id, season_id = info.loc[int(match_id), 'competition_id'], info.loc[int(match_id), 'season_id']
+        file = f'competition_id={competition_id}/season_id={season_id}/{match_id}.arrow'
+        os.makedirs(os.path.dirname(out_dir + file), exist_ok=True)
+
+        table = to_arrow(events, match_id)
+
+        # Uncompressed IPC files can be memory-mapped and read without copying
+        tmp_path = out_dir + file + '.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, out_dir + file)
+
+        index[str(match_id)] = _summary(events, match_id, competition_id, season_id, file)
+
+        if progress is not None:
+            progress(done, len(match_ids), match_id)
+
+    _write_index(out_dir, index)
+
+    return EventDataset(out_dir)
+
+
+def _read_index(root):
+    if not os.path.exists(root + INDEX_FILE):
+        return {}
+
+    with open(root + INDEX_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_index(root, index):
+    tmp_path = root + INDEX_FILE + '.tmp'
+
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+
+    os.replace(tmp_path, root + INDEX_FILE)
+
+
+class EventDataset:
+    """
+    Read side of a dataset made by build_event_dataset, safe to use from many processes at once
+    Files are memory-mapped so concurrent readers share the OS page cache, queries prune whole files from the index
+    and push the remaining predicates down to Arrow before anything is converted to pandas
+    """
+    def __init__(self, root):
+        _pyarrow()
+
+        if root[-1] != '/':
+            root = root + '/'
+
+        assert os.path.exists(root + INDEX_FILE), f"No event dataset found at: {root}"
+
+        self.root = root
+        self._index = _read_index(root)
+
+    def __len__(self):
+        return len(self._index)
+
+    def matches(self):
+        """
+        Return a dataframe of the matches in the dataset and their partitions
+        """
+        return pd.DataFrame([{k: v for k, v in entry.items() if k in ['match_id','competition_id','season_id','file']}
+                             for entry in self._index.values()])
+
+    def _files(self, team, event_types, player, minute_range, competition, season, match_ids):
+        """
+        The files that can hold rows for the query, judged from the index alone
+        """
+        files = []
+
+        for entry in self._index.values():
+            if match_ids is not None and entry['match_id'] not in match_ids:
+                continue
+            if competition is not None and entry['competition_id'] != competition:
+                continue
+            if season is not None and entry['season_id'] != season:
+                continue
+            if team is not None and team not in entry['team_name' if isinstance(team, str) else 'team_id']:
+                continue
+            if player is not None and player not in entry['player_name' if isinstance(player, str) else 'player_id']:
+                continue
+            if event_types is not None and not set(event_types) & set(entry['type_name']):
+                continue
+            if minute_range is not None and entry['minute_min'] is not None and \
+                    (entry['minute_max'] < minute_range[0] or entry['minute_min'] > minute_range[1]):
+                continue
+
+            files.append(self.root + entry['file'])
+
+        return files
+
+    def query(self, team=None, event_types=None, player=None, minute_range=None, competition=None, season=None,
+              match_ids=None, columns=None, as_table=False):
+        """
+        Return the events that meet every filter given
+        team/player can be an id (int) or a name (str), event_types a list of type names, minute_range an inclusive (from, to) tuple
+        competition/season are ids, columns (optional) = only read these columns
+        as_table = True returns the pyarrow Table instead of a pandas dataframe
+        """
+        pa = _pyarrow()
+        pc = pa.compute
+
+        if match_ids is not None:
+            match_ids = {int(m) for m in match_ids}
+
+        tables = []
+
+        for file in self._files(team, event_types, player, minute_range, competition, season, match_ids):
+            # Zero-copy: the table's buffers point straight into the memory-mapped file
+            table = pa.ipc.open_file(pa.memory_map(file, 'r')).read_all()
+
+            mask = None
+            predicates = []
+            if team is not None:
+                predicates.append(pc.equal(table['team_name' if isinstance(team, str) else 'team_id'], team))
+            if player is not None and ('player_name' if isinstance(player, str) else 'player_id') in table.column_names:
+                predicates.append(pc.equal(table['player_name' if isinstance(player, str) else 'player_id'], player))
+            elif player is not None:
+                continue
+            if event_types is not None:
+                predicates.append(pc.is_in(table['type_name'], value_set=pa.array(event_types)))
+            if minute_range is not None:
+                predicates.append(pc.and_(pc.greater_equal(table['minute'], minute_range[0]),
+                                          pc.less_equal(table['minute'], minute_range[1])))
+
+            for predicate in predicates:
+                mask = predicate if mask is None else pc.and_(mask, predicate)
+
+            if columns is not None:
+                table = table.select([col for col in columns if col in table.column_names])
+
+            # Only the selected rows are copied out of the mapped file
+            tables.append(table.filter(pc.fill_null(mask, False)) if mask is not None else table)
+
+        if not tables:
+            return pa.table({}) if as_table else pd.DataFrame(columns=columns)
+
+        try:
+            table = pa.concat_tables(tables, promote_options='permissive')
+        except TypeError:
+            table = pa.concat_tables(tables, promote=True)
+
+        return table if as_table else table.to_pandas()
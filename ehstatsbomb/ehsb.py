@@ -1,23 +1,73 @@
 import os
+import numpy as np
 import pandas as pd
 import json
-from pandas.io.json import json_normalize
-import matplotlib.pyplot as plt
-from matplotlib.patches import Arc
+import asyncio
+from functools import partial
+try:
+    from pandas import json_normalize
+except ImportError:
+    from pandas.io.json import json_normalize
+from .cache import DiskCache, MatchCache, deep_copy
+from .loader import _make_executor, pool_map, load_json_files, prefetch_iter, prune_events, filter_events
+from .compact import compact_events, split_coordinates
+from .index import MatchIndex
+from .manifest import file_hash, load_manifest, save_manifest, load_table, save_table
+from .network import NETWORK_COLUMNS, passing_network
+from .aggregate import resolve_specs, load_filters, map_events, map_file, run_aggregates
+from .positions import windowed_positions, clock
+from . import dataset
+from .plotting import draw_pitch, render_match, render_task
+from .instrument import Instrumentation, stage, instrumented
+from .lineups import LINEUP_EVENT_COLUMNS, build_lineup, set_home_away, minutes_played
+
+# Shipped as package data, only read once a plot needs team colours
+COLOUR_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'color-coding-teams.csv')
 
 class MyClass:
-    def __init__(self):
+    def __init__(self, cache_dir=None, cache_size=16, cache_bytes=None, workers=None, executor='thread', compact=False,
+                 instrument=False):
+        """
+        cache_dir (optional) = folder where parsed event data is stored as Parquet, so each match file is only parsed once
+        cache_size = max number of parsed matches kept in memory (0 disables the in-memory cache)
+        cache_bytes (optional) = max total bytes of parsed matches kept in memory
+        workers (optional) = number of files parsed at once by the bulk loaders (defaults to the number of cores, 1 = serial)
+        executor can be 'thread' (Default) or 'process' - json parsing holds the GIL, so only 'process' scales with cores
+                 ('thread' overlaps file reads only), scripts using processes need an if __name__ == '__main__' guard on Windows
+        compact = True to load event data in a smaller typed form: location columns split into float32 <col>_x/<col>_y(/<col>_z),
+                  repeated strings as categoricals and ids as nullable integers
+        instrument = True to record per-stage timings, call counts, bytes read and rows produced, see stats
+        """
         self._match_info_df = None
+        self._match_index = MatchIndex()
         self._root_path = None
+        self._compact = compact
+        self._disk_cache = DiskCache(cache_dir, tag='compact' if compact else None) if cache_dir else None
+        self._match_cache = MatchCache(max_entries=cache_size, max_bytes=cache_bytes)
+        self._lineup_cache = DiskCache(cache_dir, tag='lineup') if cache_dir else None
+        self._lineups = {}
+        self._workers = workers
+        self._executor = executor
         self._title_font = "Alegreya Sans"
         self._main_font = "Open Sans"
-        
-        # import colour codes for teams
-        self._c = pd.read_csv("C:/Users/Ewan/Git Repo/ehstatsbomb/ehstatsbomb/color-coding-teams.csv",encoding='latin1').set_index('name')
-        self._c['colcode'].fillna('blue', inplace=True)
-        self._c['textcode'].fillna('white', inplace=True)
+        self._colour_table = None
+        self._instr = Instrumentation() if instrument else None
+        self._parse_pool = None
+        self._inflight = {}
+
+    @property
+    def _colours(self):
+        """
+        Colour codes for teams, loaded the first time a plot needs them
+        """
+        if self._colour_table is None:
+            c = pd.read_csv(COLOUR_CSV,encoding='latin1').set_index('name')
+            c['colcode'] = c['colcode'].fillna('blue')
+            c['textcode'] = c['textcode'].fillna('white')
 
-        self._colours = self._c.to_dict()
+            self._colour_table = c.to_dict()
+
+        return self._colour_table
 
 
     @staticmethod
@@ -26,56 +76,195 @@ class MyClass:
         print('Code running well')
 
     @staticmethod
-    def _open_json_file(file_path):
+    def _open_json_file(file_path, event_types=None, columns=None, compact=False, instr=None):
         """
         Open a json file as a Pandas dataframe when given a path e.g. python_prjects/data/7298.json
+        event_types/columns (optional) - only these event types and flattened columns are kept, the rest is dropped before flattening
+        compact = True to return the compact typed form of the dataframe (see compact_events)
+        instr (optional) = Instrumentation that records the read, json_load, prune, json_normalize and compact stages
         """
         assert file_path.endswith('.json') == True, f"File is not json, broken link: {file_path}"
-        data_file = open(file_path, encoding='utf-8')
-        data = json.load(data_file)
-        df = json_normalize(data, sep = "_")
+
+        raw = MyClass._read_json_file(file_path, instr=instr)
+
+        return MyClass._parse_json_data(raw, event_types=event_types, columns=columns, compact=compact, instr=instr)
+
+    @staticmethod
+    def _read_json_file(file_path, instr=None):
+        """
+        The reading half of _open_json_file, returns the raw bytes of the file
+        """
+        with stage(instr, 'read') as s:
+            with open(file_path, 'rb') as data_file:
+                raw = data_file.read()
+            s.bytes_read = len(raw)
+
+        return raw
+
+    @staticmethod
+    def _parse_json_data(raw, event_types=None, columns=None, compact=False, instr=None):
+        """
+        The parsing half of _open_json_file, turns the raw bytes of a json file into a dataframe
+        """
+        with stage(instr, 'json_load'):
+            data = json.loads(raw)
+
+        del raw
+
+        if event_types is not None or columns is not None:
+            with stage(instr, 'prune') as s:
+                data = prune_events(data, event_types=event_types, columns=columns)
+                s.rows = len(data)
+
+        with stage(instr, 'json_normalize') as s:
+            df = json_normalize(data, sep = "_")
+            s.rows = len(df)
+
+        if columns is not None:
+            df = df.reindex(columns=list(columns))
+
+        if compact:
+            with stage(instr, 'compact') as s:
+                df = compact_events(df)
+                s.rows = len(df)
 
         return df
 
-    def _extract_all_json_files(self, folder_path):
+    def _file_opener(self, **kwargs):
         """
-        Open all json files from a particular folder, concatenates as a df
+        _open_json_file with these arguments for the worker pool
+        Stages inside worker processes can't be recorded, so instrumentation only reaches the parsing in thread pools
         """
-        assert folder_path[-1] == '/', "Path must finish with /"
-        export_df = pd.DataFrame()
+        instr = self._instr if self._executor == 'thread' else None
+
+        return partial(self._open_json_file, instr=instr, **kwargs)
+
+    def _load_match_file(self, file_path, event_types=None, columns=None, memory=True):
+        """
+        Open a match event file, going through the in-memory and on-disk caches
+        memory = False doesn't add the match to the in-memory cache (for streaming passes that only see each match once)
+        """
+        return self._load_match_files([file_path], event_types=event_types, columns=columns, memory=memory)[0]
+
+    @instrumented('load_match_files')
+    def _load_match_files(self, paths, progress=None, event_types=None, columns=None, memory=True):
+        """
+        Open many match event files at once, files already in the caches are reused and the rest are parsed across the worker pool
+        With event_types/columns, a full match already in the caches is filtered, otherwise only the requested parts are parsed
+        memory = False doesn't add the parsed matches to the in-memory cache
+        Returns the dataframes in the same order as paths
+        """
+        results = [None] * len(paths)
+        keys, misses = {}, []
+
+        # rows of the cache_lookup stage = matches served from memory or disk, the misses are parsed below
+        with stage(self._instr, 'cache_lookup') as lookup:
+            for i, file_path in enumerate(paths):
+                keys[i], df = self._cached_match(file_path, event_types, columns)
+
+                if df is None:
+                    misses.append(i)
+                else:
+                    results[i] = df
+
+            lookup.rows = len(paths) - len(misses)
+
+        if not misses:
+            return results
 
-        for filename in os.listdir(folder_path):
-            if filename.endswith('.json'):
-                file_path = folder_path + filename
-                df = self._open_json_file(file_path)
+        open_file = self._file_opener(event_types=event_types, columns=columns, compact=self._compact)
 
-                export_df  = pd.concat([export_df,df], sort=False)
+        with stage(self._instr, 'parse_files') as s:
+            parsed = load_json_files([paths[i] for i in misses], open_file,
+                                     workers=self._workers, executor=self._executor, progress=progress)
+            s.rows = sum(len(df) for df in parsed)
 
-        return export_df
+        filtered = event_types is not None or columns is not None
 
-    def get_all_match_info(self, matches_path, folders=None):
+        for i, df in zip(misses, parsed):
+            self._store_match(paths[i], keys[i], df, filtered, memory=memory)
+            results[i] = df
+
+        return results
+
+    def _cached_match(self, file_path, event_types=None, columns=None):
         """
-        Pass the matches_path e.g. 'python_prjects/data/matches/'
-        Pass list of folders which contain match data (optional - otherwise will scan all folders)
+        Look a match file up in the in-memory then on-disk cache
+        Returns (cache key of the request, dataframe or None on a miss)
         """
-        if matches_path[-1] != '/':
-            matches_path = matches_path+'/'
-            print('Path corrected, / added')
+        filtered = event_types is not None or columns is not None
 
-        match_info = pd.DataFrame()
+        st = os.stat(file_path)
+        full_key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+        key = full_key + (tuple(sorted(event_types)) if event_types is not None else None,
+                          tuple(columns) if columns is not None else None) if filtered else full_key
 
-        self._root_path = matches_path.replace('matches/','')
+        # A full match in memory can answer any filtered request
+        hit, df = self._match_cache.get(*dict.fromkeys([key, full_key]))
+
+        if hit != key and df is not None:
+            df = filter_events(df, event_types, columns)
+
+        if df is None and self._disk_cache is not None:
+            df = self._disk_cache.get(file_path)
+            if df is not None:
+                self._match_cache.put(full_key, df)
+                if filtered:
+                    df = filter_events(df, event_types, columns)
+
+        return key, df
 
+    def _store_match(self, file_path, key, df, filtered=False, memory=True):
+        """
+        Put a freshly parsed match in the caches, only complete matches go to disk as a filtered frame can't answer other queries
+        memory = False only stores it on disk
+        """
+        if self._disk_cache is not None and not filtered:
+            self._disk_cache.put(file_path, df)
+
+        if memory:
+            self._match_cache.put(key, df)
+
+    def _extract_all_json_files(self, folder_path, progress=None):
+        """
+        Open all json files from a particular folder, concatenates as a df
+        """
+        assert folder_path[-1] == '/', "Path must finish with /"
+
+        paths = [folder_path + filename for filename in os.listdir(folder_path) if filename.endswith('.json')]
+        dfs = load_json_files(paths, self._file_opener(), workers=self._workers, executor=self._executor, progress=progress)
+
+        if not dfs:
+            return pd.DataFrame()
+
+        with stage(self._instr, 'concat') as s:
+            df = pd.concat(dfs, sort=False)
+            s.rows = len(df)
+
+        return df
+
+    @staticmethod
+    def _list_match_files(matches_path, folders=None):
+        """
+        List the json files in the given folders of matches_path (all folders if none are given)
+        """
         if not folders:
             folders = os.listdir(matches_path)
 
+        paths = []
         for folder in folders:
-                folder_path = matches_path + folder + '/'
-                folder_df = self._extract_all_json_files(folder_path)
-                print(f'Folder {folder} extracted')
+            folder_path = matches_path + str(folder) + '/'
+            paths += [folder_path + filename for filename in os.listdir(folder_path) if filename.endswith('.json')]
+
+        return paths
+
+    @staticmethod
+    def _tidy_match_info(dfs):
+        """
+        Concatenate parsed match files once and tidy the column names
+        """
+        match_info = pd.concat(dfs, sort=False).reset_index(drop=True) if dfs else pd.DataFrame()
 
-                match_info = pd.concat([match_info,folder_df], sort=False).reset_index(drop=True)
-        
         # Remove some of the stupid names
         match_info.rename(columns={'competition_competition_id':'competition_id',
                                     'competition_competition_name':'competition_name',
@@ -90,12 +279,140 @@ class MyClass:
                                     'away_team_away_team_gender':'away_team_gender',
                                     'away_team_away_team_group':'away_team_group'}, inplace=True)
 
+        return match_info
+
+    def _merge_match_info(self, match_info, replace=False):
+        """
+        Add match_info to the cached match info, the index works out which matches are new so there's no full-table dedup
+        replace = True overwrites the rows of matches that are already cached
+        """
+        if match_info.empty:
+            return
+
+        if self._match_info_df is None:
+            new = self._match_index.add(match_info, replace=replace)
+            self._match_info_df = match_info[new].reset_index(drop=True)
+            return
+
+        new = self._match_index.add(match_info, start=len(self._match_info_df), replace=replace)
+        self._match_info_df = pd.concat([self._match_info_df,match_info[new]], sort=False, ignore_index=True)
+
+        if replace and not all(new):
+            updates = match_info[[not n for n in new]].drop_duplicates('match_id', keep='last')
+            updates.index = [self._match_index.position(id) for id in updates['match_id']]
+
+            # Rows keep their position, so the index stays valid
+            self._match_info_df = pd.concat([self._match_info_df.drop(index=updates.index), updates], sort=False).sort_index()
+
+    def _drop_matches(self, match_ids):
+        """
+        Remove matches from the cached match info, this rebuilds the index so is only used when source files disappear
+        """
+        self._match_info_df = self._match_info_df[~self._match_info_df['match_id'].isin(match_ids)].reset_index(drop=True)
+        self._match_index = MatchIndex()
+        self._match_index.add(self._match_info_df)
+
+    @instrumented('match_info')
+    def get_all_match_info(self, matches_path, folders=None, progress=None):
+        """
+        Pass the matches_path e.g. 'python_prjects/data/matches/'
+        Pass list of folders which contain match data (optional - otherwise will scan all folders)
+        progress (optional) is called as progress(done, total, file_path) as each file is parsed
+        """
+        if matches_path[-1] != '/':
+            matches_path = matches_path+'/'
+            print('Path corrected, / added')
+
+        self._root_path = matches_path.replace('matches/','')
+
+        paths = self._list_match_files(matches_path, folders)
+
+        # Parse every file across the pool, then concatenate once
+        dfs = load_json_files(paths, self._file_opener(), workers=self._workers, executor=self._executor, progress=progress)
+        match_info = self._tidy_match_info(dfs)
+
         # "Caches" a version of match_info to use in other functions
-        if  self._match_info_df == None:
-            self._match_info_df = match_info
+        self._merge_match_info(match_info)
 
-        else:
-            self._match_info_df = pd.concat([self._match_info_df,match_info], sort=False).drop_duplicates().reset_index(drop=True)
+        return match_info
+
+    @instrumented('refresh_match_info')
+    def refresh_match_info(self, matches_path, state_dir, folders=None, progress=None):
+        """
+        Incrementally update the cached match info, only new or changed files in matches_path are parsed
+        A manifest of ingested files (path, size, mtime, hash) and the match table are kept in state_dir between runs
+        Pass list of folders (optional - otherwise will scan all folders)
+        Returns the rows of match info that were added or changed
+        """
+        if matches_path[-1] != '/':
+            matches_path = matches_path+'/'
+
+        if state_dir[-1] != '/':
+            state_dir = state_dir+'/'
+
+        os.makedirs(state_dir, exist_ok=True)
+        self._root_path = matches_path.replace('matches/','')
+
+        manifest = load_manifest(state_dir)
+        table = load_table(state_dir)
+
+        if table is None:
+            # Without the table the manifest is no use, start again
+            manifest = {}
+        elif self._match_info_df is None:
+            self._merge_match_info(table)
+
+        paths = self._list_match_files(matches_path, folders)
+        seen, changed = set(), []
+
+        for file_path in paths:
+            rel = os.path.relpath(file_path, matches_path).replace(os.sep, '/')
+            seen.add(rel)
+            st = os.stat(file_path)
+            entry = manifest.get(rel)
+
+            if entry is not None and (entry['size'], entry['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+                continue
+
+            digest = file_hash(file_path)
+
+            if entry is not None and entry['sha1'] == digest:
+                # Touched but not changed
+                entry['size'], entry['mtime_ns'] = st.st_size, st.st_mtime_ns
+                continue
+
+            changed.append((rel, file_path, st, digest))
+
+        folder_names = None if not folders else {str(folder) for folder in folders}
+        removed = [rel for rel in manifest if rel not in seen and (folder_names is None or rel.split('/')[0] in folder_names)]
+
+        dfs = load_json_files([file_path for _, file_path, _, _ in changed], self._file_opener(),
+                              workers=self._workers, executor=self._executor, progress=progress)
+        match_info = self._tidy_match_info(dfs)
+
+        self._merge_match_info(match_info, replace=True)
+
+        # Matches that were in a changed or deleted file but aren't any more
+        stale_ids = set()
+        for (rel, _, st, digest), df in zip(changed, dfs):
+            match_ids = [int(id) for id in df['match_id']] if 'match_id' in df.columns else []
+            if rel in manifest:
+                stale_ids.update(set(manifest[rel]['match_ids']) - set(match_ids))
+            manifest[rel] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha1': digest, 'match_ids': match_ids}
+
+        for rel in removed:
+            stale_ids.update(manifest.pop(rel)['match_ids'])
+
+        # A match that moved to another file is still current
+        if stale_ids:
+            stale_ids -= {id for entry in manifest.values() for id in entry['match_ids']}
+
+        if stale_ids and self._match_info_df is not None:
+            self._drop_matches(stale_ids)
+
+        if self._match_info_df is not None:
+            save_table(state_dir, self._match_info_df)
+        save_manifest(state_dir, manifest)
 
         return match_info
 
@@ -108,20 +425,36 @@ class MyClass:
         assert identifier != None, "Team identifier not specified"
         assert self._match_info_df is not None, "Match info dataframe not found, please run get_all_match_info"
 
-        hfilter = 'home_team_' + category
-        afilter = 'away_team_' + category
-
-        _df = self._match_info_df[(self._match_info_df[hfilter]==identifier) | (self._match_info_df[afilter]==identifier)]
-        
-        ids = _df['match_id'].unique().tolist()
+        ids = self._match_index.match_ids(**{'team_' + category: identifier})
+        ids = sorted(ids, key=self._match_index.position)
 
         assert len(ids)>0, "No matches found"
 
         return ids
 
-    def get_specific_match(self, match_id, path=None):
+    def find_matches(self, team=None, competition=None, season=None, date_from=None, date_to=None):
+        """
+        Return the rows of match info that meet every filter given
+        team, competition and season can each be an id (int) or a name (str) e.g. find_matches(team='Chelsea FCW', season='2018/2019')
+        date_from/date_to (optional) = inclusive match_date range e.g. '2019-01-01'
+        """
+        assert self._match_info_df is not None, "Match info dataframe not found, please run get_all_match_info"
+
+        criteria = {}
+        for prefix, value in [('team',team), ('competition',competition), ('season',season)]:
+            if value is not None:
+                criteria[prefix + ('_name' if isinstance(value, str) else '_id')] = value
+
+        ids = self._match_index.match_ids(date_from=date_from, date_to=date_to, **criteria)
+        positions = sorted(self._match_index.position(id) for id in ids)
+
+        return self._match_info_df.iloc[positions]
+
+    def get_specific_match(self, match_id, path=None, event_types=None, columns=None):
         """
         Specify a match_id and a dataframe of all the event data from that match is returned
+        event_types (optional) = list of event type names to keep e.g. ['Pass','Shot']
+        columns (optional) = list of (flattened) columns to keep e.g. ['player_name','location','pass_recipient_name']
         """
 
         if path == None:
@@ -135,26 +468,426 @@ class MyClass:
 
         assert os.path.exists(full_path), f"File does not exist at this path: {full_path}"
 
-        df = self._open_json_file(full_path)
+        df = self._load_match_file(full_path, event_types=event_types, columns=columns)
 
         return df
 
-    def get_team_event_data(self, identifier, category):
+    def warm_cache(self, match_ids=None, path=None, progress=None):
+        """
+        Parse and store event data in the on-disk cache ahead of time, the files are parsed across the worker pool
+        match_ids (optional) - otherwise every match in match info (or every file in the events folder) is cached
+        progress (optional) is called as progress(done, total, file_path) as each match file is parsed
+        """
+        assert self._disk_cache is not None, "No cache_dir set, create MyClass(cache_dir=...)"
+
+        if path == None:
+            assert self._root_path != None, "path must be specified"
+            path = self._root_path + 'events/'
+
+        if path[-1] != '/':
+            path = path+'/'
+
+        if match_ids is None:
+            if self._match_info_df is not None:
+                match_ids = self._match_info_df['match_id'].unique().tolist()
+            else:
+                match_ids = [f[:-5] for f in os.listdir(path) if f.endswith('.json')]
+
+        paths = [f'{path}{match_id}.json' for match_id in match_ids]
+
+        # Only the disk cache is being warmed, the in-memory cache is left as it is
+        self._load_match_files([full_path for full_path in paths if os.path.exists(full_path)], progress=progress, memory=False)
+
+    def clear_cache(self):
+        """
+        Delete everything held in the in-memory and on-disk caches
+        """
+        self._match_cache.clear()
+        self._lineups = {}
+
+        if self._disk_cache is not None:
+            self._disk_cache.clear()
+
+    def memory_cache_info(self):
+        """
+        Return a dictionary with the hits, misses, entries and bytes of the in-memory match cache
+        """
+        return self._match_cache.info()
+
+    def cache_info(self):
+        """
+        Return a dataframe describing each on-disk cache entry (source file, format, bytes, stale)
+        """
+        assert self._disk_cache is not None, "No cache_dir set, create MyClass(cache_dir=...)"
+
+        return self._disk_cache.info()
+
+    def stats(self):
+        """
+        Return a dataframe of the calls, seconds (total/mean/max), bytes read and rows produced of each instrumented stage so far
+        Stages nest, e.g. avg_positions includes starting_xis, position_events and the load_match_files/json_load/json_normalize below them
+        """
+        assert self._instr is not None, "Instrumentation is off, create MyClass(instrument=True)"
+
+        return self._instr.stats()
+
+    def reset_stats(self):
+        """
+        Clear the instrumentation totals
+        """
+        assert self._instr is not None, "Instrumentation is off, create MyClass(instrument=True)"
+
+        self._instr.reset()
+
+    def add_stats_hook(self, hook):
+        """
+        Call hook(stage, seconds, bytes_read, rows) every time an instrumented stage finishes (turns instrumentation on)
+        """
+        if self._instr is None:
+            self._instr = Instrumentation()
+
+        self._instr.add_hook(hook)
+
+    def remove_stats_hook(self, hook):
+        assert self._instr is not None, "Instrumentation is off, create MyClass(instrument=True)"
+
+        self._instr.remove_hook(hook)
+
+    def profile(self, method, *args, sort='cumulative', **kwargs):
+        """
+        Run one call under cProfile e.g. result, prof = sb.profile('plot_passing_maps', 3775648)
+        method = name of a MyClass method (or any function), the remaining arguments are passed to it
+        Returns (result, pstats.Stats sorted by sort), use prof.print_stats(20) to see the top entries
+        """
+        import cProfile
+        import pstats
+
+        func = getattr(self, method) if isinstance(method, str) else method
+
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args, **kwargs)
+
+        return result, pstats.Stats(profiler).sort_stats(sort)
+
+    def get_team_event_data(self, identifier, category, path=None, progress=None, event_types=None, columns=None):
         """
         Return event data from all matches involving your chosen team
+        progress (optional) is called as progress(done, total, file_path) as each match file is parsed
+        event_types/columns (optional) = only keep these event types/columns, see get_specific_match
         """
         assert category in ['name','id']
         assert identifier != None, "Team identifier not specified"
 
+        if path == None:
+            assert self._root_path != None, "path must be specified"
+            path = self._root_path + 'events/'
+
+        if path[-1] != '/':
+            path = path+'/'
+
         matches = self.get_team_match_ids(identifier,category)
-        events = pd.DataFrame()
+        paths = [f'{path}{id}.json' for id in matches]
+
+        for full_path in paths:
+            assert os.path.exists(full_path), f"File does not exist at this path: {full_path}"
+
+        dfs = self._load_match_files(paths, progress=progress, event_types=event_types, columns=columns)
 
-        for id in matches:
-            _df = self.get_specific_match(id)
-            events = pd.concat([events,_df], sort=False)
+        with stage(self._instr, 'concat') as s:
+            events = pd.concat(dfs, sort=False)
+            s.rows = len(events)
 
         return events
 
+    def iter_matches(self, match_ids, path=None, prefetch=1, event_types=None, columns=None):
+        """
+        Yield (match_id, event dataframe) one match at a time, so only a few matches are held in memory at once
+        Matches already in the in-memory cache are reused, but the ones parsed here aren't added to it
+        prefetch = number of upcoming match files read and parsed on a background thread while you work on the current one (0 = off)
+        event_types/columns (optional) = only keep these event types/columns, see get_specific_match
+        """
+        if path == None:
+            assert self._root_path != None, "path must be specified"
+            path = self._root_path + 'events/'
+
+        if path[-1] != '/':
+            path = path+'/'
+
+        def load(match_id):
+            full_path = f'{path}{match_id}.json'
+            assert os.path.exists(full_path), f"File does not exist at this path: {full_path}"
+            return self._load_match_file(full_path, event_types=event_types, columns=columns, memory=False)
+
+        for match_id, df in prefetch_iter(load, match_ids, prefetch=prefetch):
+            yield match_id, df
+
+    def iter_team_events(self, identifier, category, chunksize=None, path=None, prefetch=1, event_types=None, columns=None):
+        """
+        Yield event data from all matches involving your chosen team, one match at a time
+        chunksize (optional) = yield fixed-size chunks of this many events instead of whole matches
+        prefetch = number of upcoming match files parsed on a background thread (0 = off)
+        event_types/columns (optional) = only keep these event types/columns, see get_specific_match
+        """
+        assert category in ['name','id']
+        assert identifier != None, "Team identifier not specified"
+        assert chunksize is None or chunksize > 0, f"Invalid chunksize: {chunksize}"
+
+        matches = self.get_team_match_ids(identifier,category)
+        buffer, buffered = [], 0
+
+        for match_id, df in self.iter_matches(matches, path=path, prefetch=prefetch, event_types=event_types, columns=columns):
+            if chunksize is None:
+                yield df
+                continue
+
+            buffer.append(df)
+            buffered += len(df)
+
+            if buffered >= chunksize:
+                events = pd.concat(buffer, sort=False)
+                for start in range(0, len(events) - chunksize + 1, chunksize):
+                    yield events.iloc[start:start+chunksize]
+
+                remainder = events.iloc[len(events) - len(events) % chunksize:]
+                buffer, buffered = [remainder], len(remainder)
+
+        if chunksize is not None and buffered:
+            yield pd.concat(buffer, sort=False)
+
+    def _async_pool(self):
+        """
+        The bounded pool the async methods parse in, created on first use with the workers/executor given to MyClass
+        """
+        if self._parse_pool is None:
+            self._parse_pool = _make_executor(self._executor, self._workers or os.cpu_count() or 1)
+
+        return self._parse_pool
+
+    def close(self):
+        """
+        Shut down the pool used by the async methods (it is created again if they are called afterwards)
+        """
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+
+    async def _aparse_match_file(self, file_path, key, event_types=None, columns=None):
+        """
+        Read a match file on the loop's default executor, parse it in the bounded pool and cache the result
+        """
+        loop = asyncio.get_running_loop()
+        instr = self._instr if self._executor == 'thread' else None
+
+        raw = await loop.run_in_executor(None, self._read_json_file, file_path, instr)
+
+        parse = partial(self._parse_json_data, raw, event_types=event_types, columns=columns, compact=self._compact, instr=instr)
+        df = await loop.run_in_executor(self._async_pool(), parse)
+        del raw, parse
+
+        filtered = event_types is not None or columns is not None
+        if self._disk_cache is not None and not filtered:
+            await loop.run_in_executor(None, self._store_match, file_path, key, df, filtered)
+        else:
+            self._store_match(file_path, key, df, filtered)
+
+        return df
+
+    async def _aload_match_file(self, file_path, event_types=None, columns=None):
+        """
+        Async _load_match_file, concurrent requests for the same file (and filters) share a single read and parse
+        """
+        loop = asyncio.get_running_loop()
+
+        # The lookup only touches disk when there is a cache_dir
+        if self._disk_cache is None:
+            key, df = self._cached_match(file_path, event_types, columns)
+        else:
+            key, df = await loop.run_in_executor(None, self._cached_match, file_path, event_types, columns)
+
+        if df is not None:
+            return df
+
+        inflight_key = (loop, key)
+        task = self._inflight.get(inflight_key)
+
+        if task is None:
+            task = loop.create_task(self._aparse_match_file(file_path, key, event_types=event_types, columns=columns))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+
+        # Shielded so a cancelled caller doesn't cancel the parse the other callers are waiting on
+        df = await asyncio.shield(task)
+
+        # Every caller gets its own copy of the shared frame, nested lists included
+        return deep_copy(df)
+
+    async def aget_specific_match(self, match_id, path=None, event_types=None, columns=None):
+        """
+        Async get_specific_match for use inside an event loop (e.g. a web service), the loop is never blocked on reading or parsing
+        Files are read on the loop's default executor and parsed in a pool of workers (see MyClass), call close() to shut it down
+        With executor='process' the parsing also stays off the loop's GIL, so other requests keep being served while it runs
+        Concurrent requests for the same match share a single parse
+        """
+        if path == None:
+            assert self._root_path != None, "path must be specified"
+            path = self._root_path + 'events/'
+
+        if path[-1] != '/':
+            path = path+'/'
+
+        full_path = f'{path}{match_id}.json'
+
+        assert os.path.exists(full_path), f"File does not exist at this path: {full_path}"
+
+        return await self._aload_match_file(full_path, event_types=event_types, columns=columns)
+
+    async def aget_team_event_data(self, identifier, category, path=None, progress=None, event_types=None, columns=None):
+        """
+        Async get_team_event_data, the team's matches are loaded concurrently (see aget_specific_match)
+        progress (optional) is called as progress(done, total, file_path) as each match file is loaded
+        """
+        assert category in ['name','id']
+        assert identifier != None, "Team identifier not specified"
+
+        if path == None:
+            assert self._root_path != None, "path must be specified"
+            path = self._root_path + 'events/'
+
+        if path[-1] != '/':
+            path = path+'/'
+
+        matches = self.get_team_match_ids(identifier,category)
+        paths = [f'{path}{id}.json' for id in matches]
+
+        for full_path in paths:
+            assert os.path.exists(full_path), f"File does not exist at this path: {full_path}"
+
+        done = 0
+
+        async def load(full_path):
+            nonlocal done
+            df = await self._aload_match_file(full_path, event_types=event_types, columns=columns)
+            done += 1
+            if progress is not None:
+                progress(done, len(paths), full_path)
+            return df
+
+        dfs = await asyncio.gather(*[load(full_path) for full_path in paths])
+
+        return await asyncio.get_running_loop().run_in_executor(None, partial(pd.concat, dfs, sort=False))
+
+    def _home_team_id(self, match_id):
+        """
+        The home team's id from match info, or None when the match isn't in it
+        match_id can be an int or a str e.g. '19748', match info holds ints
+        """
+        if self._match_info_df is None:
+            return None
+
+        try:
+            home_team_id = self._match_info_df['home_team_id'].iloc[self._match_index.position(int(match_id))]
+        except KeyError:
+            return None
+
+        return None if pd.isnull(home_team_id) else int(home_team_id)
+
+    @instrumented('lineup')
+    def get_lineup(self, match_id, path=None):
+        """
+        Get a dataframe of every player that took part in a match: team (home/away), jersey number, position,
+        starter, on_time/off_time (seconds from kickoff) and minutes played
+        Built once per match from its lineup, substitution and card events, then kept in memory (and in cache_dir if set)
+        Home and away come from match info when the match is in it, otherwise from the order of the Starting XIs
+        """
+        match_id = int(match_id)
+
+        if path == None:
+            assert self._root_path != None, "path must be specified"
+            path = self._root_path + 'events/'
+
+        if path[-1] != '/':
+            path = path+'/'
+
+        full_path = f'{path}{match_id}.json'
+
+        assert os.path.exists(full_path), f"File does not exist at this path: {full_path}"
+
+        st = os.stat(full_path)
+        key = (st.st_mtime_ns, st.st_size)
+        abs_path = os.path.abspath(full_path)
+
+        cached_key, lineup = self._lineups.get(abs_path, (None, None))
+
+        if cached_key != key:
+            lineup = self._lineup_cache.get(full_path) if self._lineup_cache is not None else None
+
+            if lineup is None:
+                # Only the few columns a lineup needs are flattened (or filtered from a full match already in memory)
+                events = self._load_match_file(full_path, columns=LINEUP_EVENT_COLUMNS)
+                lineup = build_lineup(events, match_id, self._home_team_id(match_id))
+
+                if self._lineup_cache is not None:
+                    self._lineup_cache.put(full_path, lineup)
+
+            self._lineups[abs_path] = (key, lineup)
+
+        lineup = lineup.copy()
+
+        home_team_id = self._home_team_id(match_id)
+        if home_team_id is not None:
+            lineup = set_home_away(lineup, home_team_id)
+
+        return lineup
+
+    def get_lineups(self, match_ids=None, path=None, progress=None):
+        """
+        Get the lineups (see get_lineup) of many matches as one dataframe, match_ids (optional) - otherwise every match in match info
+        Matches without a lineup yet are built once, after that no event file is read again
+        progress (optional) is called as progress(done, total, match_id)
+        """
+        if match_ids is None:
+            assert self._match_info_df is not None, "Match info dataframe not found, please run get_all_match_info"
+            match_ids = self._match_info_df['match_id'].tolist()
+
+        lineups = []
+
+        for done, match_id in enumerate(match_ids, start=1):
+            lineups.append(self.get_lineup(match_id, path=path))
+            if progress is not None:
+                progress(done, len(match_ids), match_id)
+
+        if not lineups:
+            return build_lineup(pd.DataFrame(columns=LINEUP_EVENT_COLUMNS), 0)
+
+        return pd.concat(lineups, ignore_index=True)
+
+    def get_player_teams(self, match_id, path=None):
+        """
+        Return a dictionary of player_id: team_id for everyone that played in a match
+        """
+        lineup = self.get_lineup(match_id, path=path)
+
+        return dict(zip(lineup['player_id'].tolist(), lineup['team_id'].tolist()))
+
+    def get_minutes_played(self, identifier=None, category=None, match_ids=None, path=None, progress=None):
+        """
+        Return the appearances, starts and minutes played of each player across matches, from the lineups
+        identifier/category (optional) = only this team's matches and players e.g. ('Chelsea FCW', 'name')
+        match_ids (optional) - otherwise the team's matches, or every match in match info
+        """
+        if identifier is not None:
+            assert category in ['name','id']
+            if match_ids is None:
+                match_ids = self.get_team_match_ids(identifier, category)
+
+        lineups = self.get_lineups(match_ids, path=path, progress=progress)
+
+        if identifier is not None:
+            lineups = lineups[lineups['team_name' if category == 'name' else 'team_id'] == identifier]
+
+        return minutes_played(lineups)
+
+    @instrumented('starting_xis')
     def get_starting_xis(self, match_id, ha=None, form='df', path=None):
         """
         Get a dictionary or dataframe of starting xis from a particular match, this returns the Player Id, Name and Jersey Number
@@ -168,24 +901,19 @@ class MyClass:
             assert self._root_path != None, "path must be specified"
             path = self._root_path + 'events/'
 
-        df = self.get_specific_match(match_id, path=path)
-
-        df = df[df['type_name'] == 'Starting XI']
-
-        home_xi = df.iloc[0]['tactics_lineup']
-        away_xi = df.iloc[1]['tactics_lineup']
+        lineup = self.get_lineup(match_id, path=path)
+        starters = lineup[lineup['starter']]
 
         ht, at = {},{}
 
-        for item,dic,team in zip([home_xi, away_xi],[ht,at],['home','away']):
-            for i in item:
-                id = i['player']['id']
-                dic[id] = {}
-                dic[id]['team'] = team
-                dic[id]['name'] = i['player']['name']
-                dic[id]['number'] = i['jersey_number']
-                dic[id]['position_id'] = i['position']['id']
-                dic[id]['position'] = i['position']['name']
+        for dic,team in zip([ht,at],['home','away']):
+            for i in starters[starters['team'] == team].itertuples(index=False):
+                dic[i.player_id] = {}
+                dic[i.player_id]['team'] = team
+                dic[i.player_id]['name'] = i.player_name
+                dic[i.player_id]['number'] = int(i.jersey_number)
+                dic[i.player_id]['position_id'] = int(i.position_id)
+                dic[i.player_id]['position'] = i.position
 
         if ha == 'Home':
             if form == 'dic':
@@ -206,7 +934,24 @@ class MyClass:
             else:
                 return pd.DataFrame(ht).T
 
+    @instrumented('position_events')
+    def _position_events(self, match_id, path=None):
+        """
+        Event data of a match with time_ticker (seconds from kickoff) and x/y columns, as used by the position methods
+        """
+        events = self.get_specific_match(match_id, path=path)
+
+        events['time_ticker'] = (events['minute']*60) + events['second']
+
+        # Compact frames already hold location as location_x/location_y
+        if 'location_x' not in events.columns:
+            coords = split_coordinates(events['location'])
+            events['location_x'] = coords[:,0]
+            events['location_y'] = coords[:,1]
 
+        return events.rename(columns={'location_x':'x','location_y':'y'})
+
+    @instrumented('avg_positions')
     def get_avg_positions(self, match_id, path=None):
         """
         Get average positions of the Starting XIs from a particular game
@@ -216,102 +961,166 @@ class MyClass:
             assert self._root_path != None, "path must be specified"
             path = self._root_path + 'events/'
 
+        # Events first, so the lineup is filtered from the match already in memory rather than parsed on its own
+        events = self._position_events(match_id, path=path)
         xis = self.get_starting_xis(match_id, path=path)
-        events = self.get_specific_match(match_id, path=path)
+        lineup = self.get_lineup(match_id, path=path)
 
-        events['time_ticker'] = (events['minute']*60) + events['second']
+        first_sub = lineup[~lineup['starter']].groupby('team_id')['on_time'].min()
+        full_time = int(events['time_ticker'].max()) + 1
+
+        # One window per team, from kickoff to that team's first substitution (or full time if they made none)
+        windows = [{'start': 0, 'end': int(first_sub.get(team, full_time)), 'team_id': team}
+                   for team in events['team_id'].dropna().unique()]
+
+        with stage(self._instr, 'position_windows') as s:
+            presub_df = windowed_positions(events, windows)
+            s.rows = len(presub_df)
+        presub_df['valid_until'] = presub_df['end'].map(clock)
+
+        presub_df = presub_df.merge(xis, how='inner', left_on='player_id', right_index=True)
+
+        presub_df = presub_df[['team_id','team_name','player_id','player_name'
+                            ,'team', 'number', 'position_id', 'position','valid_until','x','y']]
+
+        presub_df = presub_df.astype({'team_name':object, 'player_name':object})
+
+        return presub_df.sort_values(['team_id','player_id']).reset_index(drop=True)
+
+    @instrumented('windowed_positions')
+    def get_windowed_positions(self, match_id, windows='substitutions', minutes=15, step=None, path=None):
+        """
+        Get average positions of every player in any number of time windows of a match, as a long dataframe
+        (window, label, start, end, team_id, team_name, player_id, player_name, x, y, count) - start/end are seconds from kickoff
+        windows can be:
+            'substitutions' - each team's spells between its substitutions
+            'halves' - one window per period
+            'rolling' - windows of minutes length starting every step minutes (step defaults to minutes)
+            a list of (start_minute, end_minute) tuples
+        """
+        events = self._position_events(match_id, path=path)
+        full_time = int(events['time_ticker'].max()) + 1
+
+        if windows == 'substitutions':
+            lineup = self.get_lineup(match_id, path=path)
+            subs = lineup[~lineup['starter']]
+            spells = []
+            for team in events['team_id'].dropna().unique():
+                bounds = [0] + sorted(set(subs.loc[subs['team_id'] == team, 'on_time'].astype(int))) + [full_time]
+                spells += [{'start': s, 'end': e, 'team_id': team} for s, e in zip(bounds[:-1], bounds[1:]) if e > s]
+            windows = spells
+
+        elif windows == 'halves':
+            windows = [{'start': 0, 'end': full_time, 'period': [period], 'label': f'Period {period}'}
+                       for period in sorted(events['period'].dropna().unique())]
+
+        elif windows == 'rolling':
+            step = step or minutes
+            windows = [{'start': int(start), 'end': int(start + minutes*60)} for start in np.arange(0, full_time, step*60)]
+
+        else:
+            windows = [{'start': int(start*60), 'end': int(end*60)} for start, end in windows]
+
+        with stage(self._instr, 'position_windows') as s:
+            df = windowed_positions(events, windows)
+            s.rows = len(df)
+
+        return df.astype({'team_name':object, 'player_name':object})
+
+    @instrumented('passing_network')
+    def get_passing_network(self, match_id, path=None, successful_only=True):
+        """
+        Get the passing network of a match as a PassingNetwork of:
+        edges (directed pass counts), pairs (undirected pass counts), matrix (numpy adjacency matrix) and players (the matrix's row/column order)
+        successful_only = only count completed passes
+        """
+        events = self.get_specific_match(match_id, path=path, event_types=['Pass'], columns=NETWORK_COLUMNS)
 
+        return passing_network(events, successful_only=successful_only)
 
-        sub_dict = events[events['type_name'] == 'Substitution'].groupby('team_id').agg(
-            {'minute':lambda x: x.iloc[0],'second':lambda x: x.iloc[0],'time_ticker':'min'}).to_dict()
+    def get_passing_networks(self, match_ids, path=None, successful_only=True, prefetch=1):
+        """
+        Get the passing networks of many matches (e.g. a whole season) as a dictionary of match_id: PassingNetwork
+        Matches are loaded one at a time with only their pass events and columns, see iter_matches
+        """
+        networks = {}
 
-        #players = xis.index.tolist()
+        for match_id, events in self.iter_matches(match_ids, path=path, prefetch=prefetch, event_types=['Pass'], columns=NETWORK_COLUMNS):
+            networks[match_id] = passing_network(events, successful_only=successful_only)
 
-        df = events[['team_id','team_name','player_id','player_name','location','time_ticker','minute','second']].dropna()
+        return networks
 
-        df = df.merge(xis, how='inner', left_on='player_id', right_index=True)
+    def aggregate(self, specs, match_ids=None, path=None, workers=None, executor=None, progress=None):
+        """
+        Compute season (or competition) level aggregates without holding every event in memory
+        Each match is reduced to small partial aggregates in a worker and the partials are merged as they arrive
+        specs = list of AggSpec and/or names of built-in aggregates: 'pass_pairs', 'shots_xg', 'events_per_type'
+        match_ids (optional) - otherwise every match in match info
+        Returns a dictionary of spec name: dataframe
+        """
+        if path == None:
+            assert self._root_path != None, "path must be specified"
+            path = self._root_path + 'events/'
 
-        df['x'] = df['location'].apply(lambda x: x[0])
-        df['y'] = df['location'].apply(lambda x: x[1])
+        if path[-1] != '/':
+            path = path+'/'
 
-        presub_df = pd.DataFrame()
+        if match_ids is None:
+            assert self._match_info_df is not None, "Match info dataframe not found, please run get_all_match_info"
+            match_ids = self._match_info_df['match_id'].tolist()
 
-        for team in df['team_id'].unique().tolist():
-            _df = df[(df['team_id'] == team) & (df['team_id'] < sub_dict['time_ticker'][team])]
-            _df['valid_until'] = str(sub_dict['minute'][team]) + ':' + str(sub_dict['second'][team])
-            presub_df = pd.concat([presub_df,_df])
+        specs = resolve_specs(specs)
+        event_types, columns = load_filters(specs)
+        executor = executor or self._executor
 
+        paths = [f'{path}{match_id}.json' for match_id in match_ids]
+        for full_path in paths:
+            assert os.path.exists(full_path), f"File does not exist at this path: {full_path}"
 
-        presub_df = presub_df.groupby(['team_id','team_name','player_id','player_name'
-                            ,'team', 'number', 'position_id', 'position','valid_until'], as_index=False).agg({'x':'mean','y':'mean'})
+        if executor == 'process':
+            map_func = partial(map_file, specs, event_types, columns, self._compact)
+        else:
+            map_func = lambda full_path: map_events(specs, self._load_match_file(full_path, event_types=event_types, columns=columns,
+                                                                                 memory=False))
 
-        return presub_df
+        return run_aggregates(map_func, paths, specs, workers=workers or self._workers, executor=executor, progress=progress)
 
+    def build_event_dataset(self, out_dir, match_ids=None, path=None, overwrite=False, progress=None):
+        """
+        Convert event files into a memory-mapped Arrow dataset partitioned by competition and season (needs pyarrow)
+        match_ids (optional) - otherwise every match in match info, overwrite = False skips matches already converted
+        Returns an EventDataset, which other processes can also open with ehstatsbomb.dataset.EventDataset(out_dir)
+        e.g. ds.query(team='Chelsea FCW', event_types=['Shot'], minute_range=(0,45))
+        """
+        return dataset.build_event_dataset(self, out_dir, match_ids=match_ids, path=path, overwrite=overwrite, progress=progress)
 
     @staticmethod
-    def _plot_football_pitch(scale, lcolour='white', pcolour='grey', fcolour='#444444'):
-        #Create figure
-        fig=plt.figure(figsize=[scale*6,scale*4])
-        ax=fig.add_subplot(1,1,1)
-        
-        # Set colours
-        fig.set_facecolor(fcolour)
-        ax.patch.set_facecolor(pcolour)
-
-        #Pitch Outline & Centre Line
-        plt.plot([0,0],[0,90], color=lcolour)
-        plt.plot([0,130],[90,90], color=lcolour)
-        plt.plot([130,130],[90,0], color=lcolour)
-        plt.plot([130,0],[0,0], color=lcolour)
-        plt.plot([65,65],[0,90], color=lcolour)
-
-        #Left Penalty Area
-        plt.plot([16.5,16.5],[65,25],color=lcolour)
-        plt.plot([0,16.5],[65,65],color=lcolour)
-        plt.plot([16.5,0],[25,25],color=lcolour)
-
-        #Right Penalty Area
-        plt.plot([130,113.5],[65,65],color=lcolour)
-        plt.plot([113.5,113.5],[65,25],color=lcolour)
-        plt.plot([113.5,130],[25,25],color=lcolour)
-
-        #Left 6-yard Box
-        plt.plot([0,5.5],[54,54],color=lcolour)
-        plt.plot([5.5,5.5],[54,36],color=lcolour)
-        plt.plot([5.5,0.5],[36,36],color=lcolour)
-
-        #Right 6-yard Box
-        plt.plot([130,124.5],[54,54],color=lcolour)
-        plt.plot([124.5,124.5],[54,36],color=lcolour)
-        plt.plot([124.5,130],[36,36],color=lcolour)
-
-        #Prepare Circles
-        centreCircle = plt.Circle((65,45),9.15,color=lcolour,fill=False)
-        centreSpot = plt.Circle((65,45),0.8,color=lcolour)
-        leftPenSpot = plt.Circle((11,45),0.8,color=lcolour)
-        rightPenSpot = plt.Circle((119,45),0.8,color=lcolour)
-
-        #Draw Circles
-        ax.add_patch(centreCircle)
-        ax.add_patch(centreSpot)
-        ax.add_patch(leftPenSpot)
-        ax.add_patch(rightPenSpot)
-
-        #Prepare Arcs
-        leftArc = Arc((11,45),height=18.3,width=18.3,angle=0,theta1=310,theta2=50,color=lcolour)
-        rightArc = Arc((119,45),height=18.3,width=18.3,angle=0,theta1=130,theta2=230,color=lcolour)
-
-        #Draw Arcs
-        ax.add_patch(leftArc)
-        ax.add_patch(rightArc)
-
-        #Tidy Axes
-        plt.axis('off')
-
-    def plot_avg_positions(self, match_id, ha='All', path=None, scale=1, fsize=12):
+    def _plot_football_pitch(scale, lcolour='white', pcolour='grey', fcolour='#444444', ax=None):
+        """
+        Draw a football pitch, on a new pyplot figure unless an ax is given, returns the ax
+        """
+        if ax is None:
+            # matplotlib is only imported once something is plotted
+            import matplotlib.pyplot as plt
+
+            #Create figure
+            fig=plt.figure(figsize=[scale*6,scale*4])
+            ax=fig.add_subplot(1,1,1)
+
+            # Set colours
+            fig.set_facecolor(fcolour)
+            ax.patch.set_facecolor(pcolour)
+
+        draw_pitch(ax, lcolour)
+
+        return ax
+
+    @instrumented('plot_avg_positions')
+    def plot_avg_positions(self, match_id, ha='All', path=None, scale=1, fsize=12, ax=None):
         """
         Plot the average postitions of the Starting XIs on a football pitch
         ha can be 'Home', 'Away' or 'All'
+        ax (optional) = matplotlib axes already holding a pitch (e.g. from plotting.pitch_figure), otherwise a new pyplot figure is drawn
         """
         assert match_id != None, "Specify a match_id"
         assert ha in ['Home','Away','All'], f"ha not recognised: {ha}"
@@ -323,9 +1132,10 @@ class MyClass:
         df = self.get_avg_positions(match_id, path=path)
 
         home = df[df['team'] == 'home']
-        away = df[df['team'] == 'away']
+        away = df[df['team'] == 'away'].copy()
 
-        self._plot_football_pitch(scale=scale)
+        if ax is None:
+            ax = self._plot_football_pitch(scale=scale)
 
         if ha == 'Home':
             lists = zip([home],[0],['left'])
@@ -333,25 +1143,28 @@ class MyClass:
             lists = zip([away],[0],['left'])
         else:
             lists = zip([home,away],[0,130],['left','right'])
-            pd.set_option('mode.chained_assignment', None)
             away['x'] = 120 - away['x']
             away['y'] = 80 - away['y']             
         
         for team,x,align in lists:
-            plt.scatter(team['x'],team['y'], s=200*scale, marker='o', c=self._colours['colcode'][team['team_name'].max()])
-            plt.text(x=x,y=96, s=team['team_name'].max(), c=self._colours['colcode'][team['team_name'].max()], fontsize=10*scale
+            ax.scatter(team['x'],team['y'], s=200*scale, marker='o', c=self._colours['colcode'][team['team_name'].max()])
+            ax.text(x,96, team['team_name'].max(), c=self._colours['colcode'][team['team_name'].max()], fontsize=10*scale
             , ha=align, fontfamily=self._title_font, fontweight="bold")
-            plt.text(x=x,y=92, s="Valid up to: " + team['valid_until'].max(), c='w', fontsize=6*scale
+            ax.text(x,92, "Valid up to: " + team['valid_until'].max(), c='w', fontsize=6*scale
                     , ha=align, fontfamily=self._main_font)
             
             for player in team.index:
-                plt.annotate(xy=(team.loc[player]['x'],team.loc[player]['y']-1/scale),s=team.loc[player]['number']
+                ax.annotate(team.loc[player]['number'], xy=(team.loc[player]['x'],team.loc[player]['y']-1/scale)
                 , fontsize=12, c=self._colours['textcode'][team.loc[player]['team_name']], ha="center", fontfamily=self._main_font)
 
-    def plot_passing_maps(self, match_id, ha='All', path=None, scale=1, fsize=12):
+        return ax
+
+    @instrumented('plot_passing_maps')
+    def plot_passing_maps(self, match_id, ha='All', path=None, scale=1, fsize=12, ax=None):
         """
         Plot the Starting XIs average positions and who they passed to regularly (represented by the thickness of the lines between players)
         threshold = minimum number of passes from one individual to another (in either direction) for it to be represented in the plot
+        ax (optional) = matplotlib axes already holding a pitch (e.g. from plotting.pitch_figure), otherwise a new pyplot figure is drawn
         """
         assert match_id != None, "Specify a match_id"
         assert ha in ['Home','Away','All'], f"ha not recognised: {ha}"
@@ -360,40 +1173,19 @@ class MyClass:
             assert self._root_path != None, "path must be specified"
             path = self._root_path + 'events/'
 
-        match = self.get_specific_match(match_id, path=path)
-        passing = match[(match['type_name']=='Pass') & (pd.isnull(match['pass_outcome_name']))]
-
-        p = passing[['id','player_id','player_name','pass_recipient_id','pass_recipient_name']]
-
-        p_agg = p.groupby(['player_id','player_name','pass_recipient_id','pass_recipient_name'],as_index=False).agg({'id':'count'}
-                                                                                                   ).rename(columns={'id':'count'})
-        
-        combined_passes = pd.DataFrame()
-        players = p_agg['player_name'].unique().tolist()
-        recips = p_agg['pass_recipient_name'].unique().tolist()
-
-        for player in players:
-            if player in recips:
-                recips.remove(player)
-            for receiver in recips:
-                player_list = [player,receiver]
-                df = p_agg[(p_agg.player_name.isin(player_list)) & (p_agg.pass_recipient_name.isin(player_list))]
-                agg = df.agg({'player_id':'max', 'player_name':'max', 'pass_recipient_id':'min', 'pass_recipient_name':'min',
-            'count':'sum'})
-                
-                agg = pd.DataFrame(agg).T.dropna()
-                
-                combined_passes = pd.concat([combined_passes,agg])
-
+        # Average positions parse (and cache) the whole match first, so the pass-only view for the network is filtered from memory
         avg_pos = self.get_avg_positions(match_id, path=path)
 
+        network = self.get_passing_network(match_id, path=path)
+        combined_passes = network.pairs[['player_id','player_name','pass_recipient_id','pass_recipient_name','count']]
+
         recip_location = avg_pos[['player_id','x','y']].rename(columns={'player_id':'pass_recipient_id','x':'recip_x','y':'recip_y'})
 
         all_passes = combined_passes.merge(recip_location, how='left', on='pass_recipient_id')
 
         passing_graph = avg_pos.merge(all_passes, how='left', on=['player_id','player_name'])
 
-        self.plot_avg_positions(match_id,scale=scale, ha=ha, path=path)
+        ax = self.plot_avg_positions(match_id,scale=scale, ha=ha, path=path, ax=ax)
 
         if ha != 'All':
             passing_graph = passing_graph[passing_graph['team'] == ha.lower()]
@@ -416,5 +1208,43 @@ class MyClass:
                 y = passing_graph.loc[i]['y']
                 recip_y = passing_graph.loc[i]['recip_y']
             
-            plt.plot([x,recip_x]
-                    ,[y,recip_y], c=self._colours['colcode'][team_name], linewidth=w/3)
\ No newline at end of file
+            ax.plot([x,recip_x]
+                    ,[y,recip_y], c=self._colours['colcode'][team_name], linewidth=w/3)
+
+        return ax
+
+    def render_match_plots(self, match_ids, out_dir, kind='passing', fmt='png', ha='All', path=None, scale=1, dpi=100,
+                           workers=None, executor='process', progress=None):
+        """
+        Render a plot for each match straight to file (out_dir/<match_id>_<kind>.<fmt>) without any pyplot or display involved
+        kind can be 'passing' (plot_passing_maps) or 'positions' (plot_avg_positions)
+        fmt can be 'png', 'svg' or anything else matplotlib saves, raster formats reuse a pitch rendered once per worker
+        Matches are rendered across a pool of workers (executor 'process' (Default) or 'thread'), returns the list of files written
+        """
+        assert kind in ['passing','positions'], f"Invalid kind: {kind}"
+
+        if path == None:
+            assert self._root_path != None, "path must be specified"
+            path = self._root_path + 'events/'
+
+        os.makedirs(out_dir, exist_ok=True)
+
+        if executor == 'thread':
+            render = lambda match_id: render_match(self, match_id, os.path.join(out_dir, f'{match_id}_{kind}.{fmt}'),
+                                                   kind=kind, ha=ha, path=path, scale=scale, dpi=dpi)
+        else:
+            # Worker processes build their own MyClass with the same cache settings, and the match info of these matches
+            # so home and away are worked out the same way as in this process
+            match_info = None
+            if self._match_info_df is not None:
+                match_info = self._match_info_df[self._match_info_df['match_id'].isin([int(m) for m in match_ids])]
+
+            config = {'init': {'cache_dir': self._disk_cache.cache_dir if self._disk_cache is not None else None,
+                               'cache_size': self._match_cache.max_entries,
+                               'cache_bytes': self._match_cache.max_bytes,
+                               'compact': self._compact},
+                      'root_path': self._root_path, 'match_info': match_info, 'out_dir': out_dir, 'kind': kind, 'fmt': fmt,
+                      'ha': ha, 'path': path, 'scale': scale, 'dpi': dpi}
+            render = partial(render_task, config)
+
+        return pool_map(render, list(match_ids), workers=workers or self._workers, executor=executor, progress=progress)
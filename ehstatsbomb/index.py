@@ -0,0 +1,131 @@
+import bisect
+from collections import defaultdict
+import pandas as pd
+
+
+class MatchIndex:
+    """
+    Lookup indexes over the cached match info
+    Hash indexes map team, competition and season (id or name) to match ids, match dates are kept sorted for range queries
+    Rows are added incrementally so loading more folders never rebuilds the index
+    """
+    KEYS = {'team_id': ['home_team_id', 'away_team_id'],
+            'team_name': ['home_team_name', 'away_team_name'],
+            'competition_id': ['competition_id'],
+            'competition_name': ['competition_name'],
+            'season_id': ['season_id'],
+            'season_name': ['season_name']}
+
+    def __init__(self):
+        self._lookup = {key: defaultdict(set) for key in self.KEYS}
+        self._positions = {}
+        self._entries = {}
+        self._date_keys = []
+        self._date_ids = []
+
+    def __contains__(self, match_id):
+        return match_id in self._positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _unindex(self, match_id, pending_dates):
+        """
+        Drop a match from the hash and date indexes (its position is kept)
+        pending_dates holds the dates of the batch being added, which aren't merged into the sorted lists yet
+        """
+        keys, date = self._entries.pop(match_id)
+
+        for key, value in keys:
+            self._lookup[key][value].discard(match_id)
+
+        if date is None:
+            return
+
+        i = bisect.bisect_left(self._date_keys, date)
+        while i < len(self._date_keys) and self._date_keys[i] == date:
+            if self._date_ids[i] == match_id:
+                del self._date_keys[i]
+                del self._date_ids[i]
+                return
+            i += 1
+
+        pending_dates.remove((date, match_id))
+
+    def add(self, df, start=0, replace=False):
+        """
+        Index the rows of df whose match_id isn't already indexed, start is the position of df's first new row in the cached match info
+        replace = True re-indexes rows whose match_id is already indexed (they keep their position)
+        Returns a boolean mask of the rows that were new
+        """
+        new = []
+        dates = []
+        columns = {col: df[col].tolist() for cols in self.KEYS.values() for col in cols if col in df.columns}
+        match_dates = df['match_date'].tolist() if 'match_date' in df.columns else [None] * len(df)
+
+        position = start
+        for i, match_id in enumerate(df['match_id'].tolist()):
+            if match_id in self._positions:
+                new.append(False)
+                if not replace:
+                    continue
+                self._unindex(match_id, dates)
+            else:
+                new.append(True)
+                self._positions[match_id] = position
+                position += 1
+
+            keys = []
+            for key, cols in self.KEYS.items():
+                for col in cols:
+                    value = columns[col][i] if col in columns else None
+                    if not pd.isnull(value):
+                        self._lookup[key][value].add(match_id)
+                        keys.append((key, value))
+
+            date = None if pd.isnull(match_dates[i]) else str(match_dates[i])
+            if date is not None:
+                dates.append((date, match_id))
+
+            self._entries[match_id] = (keys, date)
+
+        if dates:
+            # Timsort merges the two sorted runs in close to linear time
+            merged = sorted(list(zip(self._date_keys, self._date_ids)) + dates)
+            self._date_keys = [d for d, _ in merged]
+            self._date_ids = [m for _, m in merged]
+
+        return new
+
+    def position(self, match_id):
+        return self._positions[match_id]
+
+    def match_ids(self, date_from=None, date_to=None, **criteria):
+        """
+        Return the set of match ids matching every criterion e.g. match_ids(team_name='Chelsea FCW', season_id=4)
+        date_from/date_to (optional) = inclusive date range (e.g. '2019-01-31')
+        """
+        result = None
+
+        for key, value in criteria.items():
+            assert key in self.KEYS, f"Invalid key: {key}"
+            if value is None:
+                continue
+
+            ids = self._lookup[key].get(value, set())
+            result = set(ids) if result is None else result & ids
+
+        if date_from is not None or date_to is not None:
+            lo = 0 if date_from is None else bisect.bisect_left(self._date_keys, _date_key(date_from))
+            hi = len(self._date_keys) if date_to is None else bisect.bisect_right(self._date_keys, _date_key(date_to))
+            ids = set(self._date_ids[lo:hi])
+            result = ids if result is None else result & ids
+
+        if result is None:
+            result = set(self._positions)
+
+        return result
+
+
+def _date_key(value):
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
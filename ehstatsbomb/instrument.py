@@ -0,0 +1,142 @@
+import time
+import threading
+import functools
+import pandas as pd
+
+STATS_COLUMNS = ['stage', 'calls', 'seconds', 'mean_seconds', 'max_seconds', 'bytes_read', 'rows']
+
+
+class _Stage:
+    """
+    Handed out by Instrumentation.stage, set bytes_read/rows on it inside the with block
+    """
+    __slots__ = ('bytes_read', 'rows')
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.rows = 0
+
+
+class _NullStage:
+    """
+    Shared stand-in used when instrumentation is off, entering it and setting attributes on it does nothing
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _TimedStage:
+    __slots__ = ('_instr', '_name', '_stage', '_start')
+
+    def __init__(self, instr, name):
+        self._instr = instr
+        self._name = name
+
+    def __enter__(self):
+        self._stage = _Stage()
+        self._start = time.perf_counter()
+        return self._stage
+
+    def __exit__(self, *exc):
+        self._instr.record(self._name, time.perf_counter() - self._start, self._stage.bytes_read, self._stage.rows)
+        return False
+
+
+class Instrumentation:
+    """
+    Thread-safe totals of time, calls, bytes read and rows produced per named stage
+    Stages nest (e.g. load_match_files contains read, json_load and json_normalize) so their seconds overlap
+    hooks = list of functions called as hook(stage, seconds, bytes_read, rows) each time a stage finishes
+    """
+    def __init__(self, hooks=None):
+        self._totals = {}
+        self._hooks = list(hooks or [])
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """
+        Context manager timing one run of a stage e.g. with instr.stage('json_load') as s: ... s.rows = len(df)
+        """
+        return _TimedStage(self, name)
+
+    def record(self, name, seconds, bytes_read=0, rows=0):
+        with self._lock:
+            totals = self._totals.get(name)
+            if totals is None:
+                totals = self._totals[name] = [0, 0.0, 0.0, 0, 0]
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+            totals[3] += bytes_read
+            totals[4] += rows
+            hooks = list(self._hooks)
+
+        for hook in hooks:
+            hook(name, seconds, bytes_read, rows)
+
+    def add_hook(self, hook):
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        with self._lock:
+            self._hooks.remove(hook)
+
+    def reset(self):
+        with self._lock:
+            self._totals = {}
+
+    def stats(self):
+        """
+        Snapshot of the totals as a dataframe with one row per stage, in the order stages were first seen
+        """
+        with self._lock:
+            rows = [[name, calls, seconds, seconds / calls, max_seconds, bytes_read, n]
+                    for name, (calls, seconds, max_seconds, bytes_read, n) in self._totals.items()]
+
+        return pd.DataFrame(rows, columns=STATS_COLUMNS)
+
+
+def stage(instr, name):
+    """
+    instr.stage(name), or a shared do-nothing context manager when instr is None (instrumentation off)
+    """
+    if instr is None:
+        return _NULL_STAGE
+
+    return instr.stage(name)
+
+
+def instrumented(name):
+    """
+    Decorator timing a MyClass method as a stage when the instance has instrumentation on, rows = length of the result (or its dataframes)
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self._instr is None:
+                return method(self, *args, **kwargs)
+
+            with self._instr.stage(name) as s:
+                result = method(self, *args, **kwargs)
+                if isinstance(result, (pd.DataFrame, pd.Series)):
+                    s.rows = len(result)
+                elif isinstance(result, list):
+                    s.rows = sum(len(df) for df in result if isinstance(df, pd.DataFrame))
+
+            return result
+
+        return wrapper
+
+    return decorator
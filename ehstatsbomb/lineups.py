@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+LINEUP_COLUMNS = ['match_id', 'team_id', 'team_name', 'team', 'player_id', 'player_name', 'jersey_number', 'position_id', 'position',
+                  'starter', 'on_time', 'off_time', 'minutes']
+
+# The only event columns a lineup is built from, so a match can be loaded for it without flattening anything else
+LINEUP_EVENT_COLUMNS = ['type_name', 'minute', 'second', 'team_id', 'team_name', 'player_id', 'player_name', 'position_id',
+                        'position_name', 'tactics_lineup', 'substitution_replacement_id', 'substitution_replacement_name',
+                        'bad_behaviour_card_name', 'foul_committed_card_name']
+
+SENDING_OFF = ['Red Card', 'Second Yellow']
+
+
+def _value(v):
+    return None if v is None or pd.isnull(v) else v.item() if hasattr(v, 'item') else v
+
+
+def build_lineup(events, match_id, home_team_id=None):
+    """
+    One row per player that took part in a match, worked out from its Starting XI, Tactical Shift, Substitution and card events
+    on_time/off_time are seconds from kickoff (time_ticker), minutes = minutes played
+    Substitutes take the position of the player they replace, their jersey numbers come from any later Tactical Shift lineup
+    home_team_id (optional) = id of the home team, otherwise the team of the first Starting XI is taken as home
+    """
+    ticker = (events['minute'] * 60 + events['second']).to_numpy()
+    full_time = int(np.nanmax(ticker)) if len(events) else 0
+    types = events['type_name'].astype(object).to_numpy()
+
+    xis = events[types == 'Starting XI']
+
+    if home_team_id is None and len(xis):
+        home_team_id = _value(xis['team_id'].iloc[0])
+
+    players = {}
+    numbers = {}
+
+    for team_id, team_name, lineup in zip(xis['team_id'], xis['team_name'], xis['tactics_lineup']):
+        for p in lineup:
+            players[p['player']['id']] = {'team_id': _value(team_id), 'team_name': team_name,
+                                          'player_id': p['player']['id'], 'player_name': p['player']['name'],
+                                          'jersey_number': p['jersey_number'],
+                                          'position_id': p['position']['id'], 'position': p['position']['name'],
+                                          'starter': True, 'on_time': 0, 'off_time': full_time}
+
+    for lineup in events.loc[types == 'Tactical Shift', 'tactics_lineup']:
+        if isinstance(lineup, list):
+            numbers.update({p['player']['id']: p['jersey_number'] for p in lineup})
+
+    subs = events[types == 'Substitution']
+
+    for time, row in zip(ticker[types == 'Substitution'], subs.itertuples(index=False)):
+        off = _value(row.player_id)
+        on = _value(row.substitution_replacement_id)
+
+        if off in players:
+            players[off]['off_time'] = int(time)
+
+        players[on] = {'team_id': _value(row.team_id), 'team_name': row.team_name,
+                       'player_id': on, 'player_name': row.substitution_replacement_name,
+                       'jersey_number': numbers.get(on),
+                       'position_id': _value(row.position_id), 'position': row.position_name,
+                       'starter': False, 'on_time': int(time), 'off_time': full_time}
+
+    # Red cards end a player's match early
+    for col in ['bad_behaviour_card_name', 'foul_committed_card_name']:
+        if col in events.columns:
+            sent_off = events[col].isin(SENDING_OFF).to_numpy()
+            for player_id, time in zip(events.loc[sent_off, 'player_id'], ticker[sent_off]):
+                player_id = _value(player_id)
+                if player_id in players:
+                    players[player_id]['off_time'] = min(players[player_id]['off_time'], int(time))
+
+    df = pd.DataFrame(list(players.values()), columns=[col for col in LINEUP_COLUMNS if col not in ['match_id','team','minutes']])
+
+    df.insert(0, 'match_id', match_id)
+    df.insert(3, 'team', np.where(df['team_id'] == home_team_id, 'home', 'away'))
+    df['minutes'] = (df['off_time'] - df['on_time']).clip(lower=0) / 60
+
+    return df.astype({'match_id': 'int64', 'team_id': 'int64', 'player_id': 'int64', 'jersey_number': 'Int64',
+                      'position_id': 'Int64', 'starter': bool, 'on_time': 'int64', 'off_time': 'int64'})
+
+
+def set_home_away(lineup, home_team_id):
+    """
+    Label each row of a lineup 'home' or 'away' from the home team's id
+    """
+    lineup['team'] = np.where(lineup['team_id'] == home_team_id, 'home', 'away')
+
+    return lineup
+
+
+def minutes_played(lineups):
+    """
+    Appearances, starts and minutes played per player over a dataframe of lineups (e.g. a season)
+    """
+    if lineups.empty:
+        return pd.DataFrame(columns=['player_id','player_name','team_id','team_name','matches','starts','minutes'])
+
+    df = lineups.groupby(['player_id','team_id'], observed=True).agg(player_name=('player_name','last'),
+                                                                     team_name=('team_name','last'),
+                                                                     matches=('match_id','nunique'),
+                                                                     starts=('starter','sum'),
+                                                                     minutes=('minutes','sum')).reset_index()
+
+    df = df[['player_id','player_name','team_id','team_name','matches','starts','minutes']]
+
+    return df.sort_values('minutes', ascending=False).reset_index(drop=True)
@@ -0,0 +1,142 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from .compact import expand_columns
+
+
+def _make_executor(executor, workers):
+    assert executor in ['thread', 'process'], f"Invalid executor: {executor}"
+
+    if executor == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def pool_map(func, items, workers=None, executor='thread', progress=None):
+    """
+    Call func on each item across a pool of workers, returns the results in the same order as items
+    func must be picklable when executor='process'
+    workers = pool size (defaults to the number of cores, 1 runs serially in this process)
+    progress (optional) is called as progress(done, total, item) as each item finishes
+    """
+    total = len(items)
+    workers = workers or os.cpu_count() or 1
+    results = [None] * total
+
+    if workers == 1 or total <= 1:
+        for i, item in enumerate(items):
+            results[i] = func(item)
+            if progress is not None:
+                progress(i + 1, total, item)
+
+        return results
+
+    with _make_executor(executor, min(workers, total)) as pool:
+        futures = {pool.submit(func, item): i for i, item in enumerate(items)}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            results[i] = future.result()
+            if progress is not None:
+                progress(done, total, items[i])
+
+    return results
+
+
+def load_json_files(paths, open_file, workers=None, executor='thread', progress=None):
+    """
+    Parse a list of json files across a pool of workers, returns the dataframes in the same order as paths
+    open_file is called as open_file(path), see pool_map for the other arguments
+    """
+    return pool_map(open_file, paths, workers=workers, executor=executor, progress=progress)
+
+
+def prefetch_iter(func, items, prefetch=1):
+    """
+    Yield (item, func(item)) for each item in turn
+    The next prefetch results are computed on a background thread while the caller works on the current one (0 = no prefetching)
+    """
+    if not prefetch:
+        for item in items:
+            yield item, func(item)
+        return
+
+    items = iter(items)
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for item in items:
+            pending.append((item, pool.submit(func, item)))
+            if len(pending) >= prefetch:
+                break
+
+        while pending:
+            item, future = pending.popleft()
+
+            for next_item in items:
+                pending.append((next_item, pool.submit(func, next_item)))
+                break
+
+            yield item, future.result()
+
+
+def _prefixes(columns):
+    """
+    Every "_"-joined prefix of the requested columns e.g. pass_end_location -> pass, pass_end
+    """
+    prefixes = set()
+
+    for col in columns:
+        parts = col.split('_')
+        prefixes.update('_'.join(parts[:i]) for i in range(1, len(parts)))
+
+    return prefixes
+
+
+def _prune(record, columns, prefixes, prefix=''):
+    """
+    Keep only the parts of a (nested) event dictionary that flatten into one of the requested columns
+    prefixes = _prefixes(columns), so whether to descend into a nested dictionary is a single set lookup
+    """
+    pruned = {}
+
+    for key, value in record.items():
+        name = prefix + key
+
+        if name in columns:
+            pruned[key] = value
+        elif name in prefixes and isinstance(value, dict):
+            pruned[key] = _prune(value, columns, prefixes, name + '_')
+
+    return pruned
+
+
+def prune_events(data, event_types=None, columns=None):
+    """
+    Drop raw events whose type name isn't in event_types, and the fields of each event that don't make up one of columns
+    Runs on the output of json.load so unwanted events and fields are never flattened
+    """
+    if event_types is not None:
+        event_types = set(event_types)
+        data = [e for e in data if e.get('type', {}).get('name') in event_types]
+
+    if columns is not None:
+        columns = set(columns)
+        prefixes = _prefixes(columns)
+        data = [_prune(e, columns, prefixes) for e in data]
+
+    return data
+
+
+def filter_events(df, event_types=None, columns=None):
+    """
+    Apply the same event_types/columns filters to an already flattened event dataframe
+    """
+    if event_types is not None:
+        df = df[df['type_name'].isin(event_types)]
+
+    if columns is not None:
+        df = df.reindex(columns=expand_columns(df, columns))
+
+    return df.reset_index(drop=True)
@@ -0,0 +1,74 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from .cache import restore_lists
+
+
+def file_hash(file_path):
+    """
+    Return the sha1 of a file's contents
+    """
+    sha = hashlib.sha1()
+
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+
+def load_manifest(state_dir):
+    """
+    Load the manifest of ingested match files, {relative path: {'size', 'mtime_ns', 'sha1', 'match_ids'}}
+    """
+    manifest_path = state_dir + 'match_manifest.json'
+
+    if not os.path.exists(manifest_path):
+        return {}
+
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(state_dir, manifest):
+    tmp_path = state_dir + 'match_manifest.json.tmp'
+
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    os.replace(tmp_path, state_dir + 'match_manifest.json')
+
+
+def load_table(state_dir):
+    """
+    Load the persisted match info table, or None if there isn't one
+    """
+    if os.path.exists(state_dir + 'match_info.parquet'):
+        # Nested fields (e.g. home_team_managers) come back as lists, the same as a fresh get_all_match_info,
+        # match files hold explicit nulls (e.g. home_team_group) so other missing values stay None
+        return restore_lists(pd.read_parquet(state_dir + 'match_info.parquet'), nan=False)
+
+    if os.path.exists(state_dir + 'match_info.pkl'):
+        return pd.read_pickle(state_dir + 'match_info.pkl')
+
+    return None
+
+
+def save_table(state_dir, df):
+    """
+    Persist the match info table as Parquet, or pickle when pyarrow is missing or can't represent a column
+    """
+    tmp_path = state_dir + 'match_info.tmp'
+
+    try:
+        df.to_parquet(tmp_path, index=False)
+        filename, other = 'match_info.parquet', 'match_info.pkl'
+    except Exception:
+        df.to_pickle(tmp_path)
+        filename, other = 'match_info.pkl', 'match_info.parquet'
+
+    os.replace(tmp_path, state_dir + filename)
+
+    if os.path.exists(state_dir + other):
+        os.remove(state_dir + other)
@@ -0,0 +1,69 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# Columns needed from the event data to build a passing network
+NETWORK_COLUMNS = ['type_name', 'team_id', 'player_id', 'player_name', 'pass_recipient_id', 'pass_recipient_name', 'pass_outcome_name']
+
+PassingNetwork = namedtuple('PassingNetwork', ['edges', 'pairs', 'matrix', 'players'])
+PassingNetwork.__doc__ = """
+Passes between players in a match
+edges = directed pass counts (player_id -> pass_recipient_id)
+pairs = undirected pass counts, one row per pair of players with player_id < pass_recipient_id
+matrix = numpy adjacency matrix of directed pass counts, rows/columns in the order of players.index
+players = dataframe of player_name and team_id indexed by player_id
+"""
+
+
+def pass_counts(events, successful_only=True):
+    """
+    Count passes from each player to each recipient, returns team_id, player_id, pass_recipient_id, count
+    successful_only = only count completed passes (no pass_outcome_name)
+    """
+    passes = events[events['type_name'] == 'Pass']
+
+    if successful_only and 'pass_outcome_name' in passes.columns:
+        passes = passes[passes['pass_outcome_name'].isna()]
+
+    passes = passes.dropna(subset=['player_id', 'pass_recipient_id'])
+
+    return passes.groupby(['team_id', 'player_id', 'pass_recipient_id'], observed=True).size().reset_index(name='count')
+
+
+def passing_network(events, successful_only=True):
+    """
+    Build a PassingNetwork from the event data of one match in a single vectorized pass
+    """
+    edges = pass_counts(events, successful_only=successful_only)
+
+    passes = events[events['type_name'] == 'Pass']
+    names = pd.concat([
+        pd.DataFrame({'player_id': passes['player_id'], 'player_name': passes['player_name'].astype(object), 'team_id': passes['team_id']}),
+        pd.DataFrame({'player_id': passes['pass_recipient_id'], 'player_name': passes['pass_recipient_name'].astype(object), 'team_id': passes['team_id']})
+    ]).dropna(subset=['player_id']).drop_duplicates('player_id')
+
+    players = names.set_index('player_id').sort_index()
+    player_names = players['player_name']
+
+    edges['player_name'] = edges['player_id'].map(player_names)
+    edges['pass_recipient_name'] = edges['pass_recipient_id'].map(player_names)
+    edges = edges[['team_id', 'player_id', 'player_name', 'pass_recipient_id', 'pass_recipient_name', 'count']]
+
+    # Undirected: order each pair so both directions land on the same key
+    src = edges['player_id'].to_numpy()
+    dst = edges['pass_recipient_id'].to_numpy()
+    pairs = pd.DataFrame({'team_id': edges['team_id'].to_numpy(),
+                          'player_id': np.where(src < dst, src, dst),
+                          'pass_recipient_id': np.where(src < dst, dst, src),
+                          'count': edges['count'].to_numpy()})
+    pairs = pairs.astype({'player_id': edges['player_id'].dtype, 'pass_recipient_id': edges['pass_recipient_id'].dtype})
+    pairs = pairs.groupby(['team_id', 'player_id', 'pass_recipient_id'], as_index=False, observed=True)['count'].sum()
+    pairs['player_name'] = pairs['player_id'].map(player_names)
+    pairs['pass_recipient_name'] = pairs['pass_recipient_id'].map(player_names)
+    pairs = pairs[['team_id', 'player_id', 'player_name', 'pass_recipient_id', 'pass_recipient_name', 'count']]
+
+    matrix = np.zeros((len(players), len(players)), dtype=np.int64)
+    np.add.at(matrix, (players.index.get_indexer(edges['player_id']), players.index.get_indexer(edges['pass_recipient_id'])),
+              edges['count'].to_numpy())
+
+    return PassingNetwork(edges=edges.reset_index(drop=True), pairs=pairs, matrix=matrix, players=players)
@@ -0,0 +1,156 @@
+import os
+import numpy as np
+from .instrument import stage
+
+# Formats where a pre-rendered pitch can be pasted in, vector formats get the pitch drawn as lines
+RASTER_FORMATS = ['png', 'jpg', 'jpeg']
+
+_BACKGROUNDS = {}
+_WORKERS = {}
+
+
+def draw_pitch(ax, lcolour='white'):
+    """
+    Draw the lines and markings of a football pitch on ax
+    """
+    from matplotlib.patches import Arc, Circle
+
+    #Pitch Outline & Centre Line
+    ax.plot([0,0],[0,90], color=lcolour)
+    ax.plot([0,130],[90,90], color=lcolour)
+    ax.plot([130,130],[90,0], color=lcolour)
+    ax.plot([130,0],[0,0], color=lcolour)
+    ax.plot([65,65],[0,90], color=lcolour)
+
+    #Left Penalty Area
+    ax.plot([16.5,16.5],[65,25],color=lcolour)
+    ax.plot([0,16.5],[65,65],color=lcolour)
+    ax.plot([16.5,0],[25,25],color=lcolour)
+
+    #Right Penalty Area
+    ax.plot([130,113.5],[65,65],color=lcolour)
+    ax.plot([113.5,113.5],[65,25],color=lcolour)
+    ax.plot([113.5,130],[25,25],color=lcolour)
+
+    #Left 6-yard Box
+    ax.plot([0,5.5],[54,54],color=lcolour)
+    ax.plot([5.5,5.5],[54,36],color=lcolour)
+    ax.plot([5.5,0.5],[36,36],color=lcolour)
+
+    #Right 6-yard Box
+    ax.plot([130,124.5],[54,54],color=lcolour)
+    ax.plot([124.5,124.5],[54,36],color=lcolour)
+    ax.plot([124.5,130],[36,36],color=lcolour)
+
+    #Circles
+    ax.add_patch(Circle((65,45),9.15,color=lcolour,fill=False))
+    ax.add_patch(Circle((65,45),0.8,color=lcolour))
+    ax.add_patch(Circle((11,45),0.8,color=lcolour))
+    ax.add_patch(Circle((119,45),0.8,color=lcolour))
+
+    #Arcs
+    ax.add_patch(Arc((11,45),height=18.3,width=18.3,angle=0,theta1=310,theta2=50,color=lcolour))
+    ax.add_patch(Arc((119,45),height=18.3,width=18.3,angle=0,theta1=130,theta2=230,color=lcolour))
+
+    #Tidy Axes
+    ax.axis('off')
+
+
+def _new_figure(scale, dpi, pcolour, fcolour):
+    """
+    Create a figure on the Agg canvas, no pyplot state is involved so this is safe in headless workers
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=[scale*6,scale*4], dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1,1,1)
+
+    fig.set_facecolor(fcolour)
+    ax.patch.set_facecolor(pcolour)
+
+    return fig, ax
+
+
+def _pitch_background(scale, dpi, lcolour, pcolour, fcolour):
+    """
+    Render an empty pitch once per process, returns the RGBA pixels and the axis limits they were drawn with
+    """
+    key = (scale, dpi, lcolour, pcolour, fcolour)
+
+    if key not in _BACKGROUNDS:
+        fig, ax = _new_figure(scale, dpi, pcolour, fcolour)
+        draw_pitch(ax, lcolour)
+        fig.canvas.draw()
+        _BACKGROUNDS[key] = (np.asarray(fig.canvas.buffer_rgba()).copy(), ax.get_xlim(), ax.get_ylim())
+
+    return _BACKGROUNDS[key]
+
+
+def pitch_figure(scale=1, dpi=100, lcolour='white', pcolour='grey', fcolour='#444444', background=True):
+    """
+    Create a headless (fig, ax) with a football pitch on it, pass ax to a plotting method to draw on it
+    background = True pastes in a pitch rendered once per process instead of drawing its lines and patches again
+    """
+    fig, ax = _new_figure(scale, dpi, pcolour, fcolour)
+
+    if not background:
+        draw_pitch(ax, lcolour)
+        return fig, ax
+
+    image, xlim, ylim = _pitch_background(scale, dpi, lcolour, pcolour, fcolour)
+    fig.figimage(image, zorder=-1)
+
+    # Same limits as the pre-rendered pitch so anything plotted lines up with it
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    ax.set_autoscale_on(False)
+    ax.axis('off')
+
+    return fig, ax
+
+
+def render_match(sb, match_id, out_file, kind='passing', ha='All', path=None, scale=1, dpi=100):
+    """
+    Plot one match with a MyClass instance and save it to out_file, the format comes from the extension (png, svg etc.)
+    kind can be 'passing' (plot_passing_maps) or 'positions' (plot_avg_positions)
+    """
+    assert kind in ['passing','positions'], f"Invalid kind: {kind}"
+
+    fmt = os.path.splitext(out_file)[1][1:].lower()
+    fig, ax = pitch_figure(scale=scale, dpi=dpi, background=fmt in RASTER_FORMATS)
+
+    plot = sb.plot_passing_maps if kind == 'passing' else sb.plot_avg_positions
+    plot(match_id, ha=ha, path=path, scale=scale, ax=ax)
+
+    with stage(sb._instr, 'savefig'):
+        fig.savefig(out_file, facecolor=fig.get_facecolor())
+
+    return out_file
+
+
+def render_task(config, match_id):
+    """
+    Process pool entry point, each worker process keeps one MyClass per config so its caches are reused between matches
+    config['match_info'] (optional) = match info rows of the matches being rendered
+    """
+    from .ehsb import MyClass
+
+    key = repr(sorted(config['init'].items()))
+
+    if key not in _WORKERS:
+        sb = MyClass(workers=1, **config['init'])
+        sb._root_path = config['root_path']
+        _WORKERS[key] = sb
+
+    sb = _WORKERS[key]
+
+    # Home and away come from match info, a worker only merges it in once
+    if config['match_info'] is not None and int(match_id) not in sb._match_index:
+        sb._merge_match_info(config['match_info'])
+
+    out_file = os.path.join(config['out_dir'], f"{match_id}_{config['kind']}.{config['fmt']}")
+
+    return render_match(sb, match_id, out_file, kind=config['kind'], ha=config['ha'],
+                        path=config['path'], scale=config['scale'], dpi=config['dpi'])
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+POSITION_COLUMNS = ['window', 'label', 'start', 'end', 'team_id', 'team_name', 'player_id', 'player_name', 'x', 'y', 'count']
+
+
+def clock(seconds):
+    """
+    Format a time_ticker as MM:SS the way the rest of the library does e.g. 60:5
+    """
+    return f'{int(seconds) // 60}:{int(seconds) % 60}'
+
+
+def windowed_positions(events, windows):
+    """
+    Average x/y of every player in any number of time windows, from one sort of the events
+    events needs period, time_ticker, team_id, team_name, player_id, player_name, x and y columns
+    windows = list of dictionaries with start and end (time_ticker seconds, end excluded) and optionally
+              team_id (only that team's players), period (list of periods to include) and label
+    Returns a long dataframe with one row per window and player that has events in it
+    """
+    ev = events.dropna(subset=['player_id','x','y','time_ticker'])
+
+    if ev.empty or not windows:
+        return pd.DataFrame(columns=POSITION_COLUMNS)
+
+    codes, _ = pd.factorize(ev['player_id'])
+    periods = np.sort(ev['period'].unique())
+    period_codes = np.searchsorted(periods, ev['period'].to_numpy())
+    t = ev['time_ticker'].to_numpy(dtype=np.int64)
+
+    # Sort once by (player, period, time), then every window is two binary searches per player into prefix sums
+    n_periods = len(periods)
+    span = int(t.max()) + 2
+    key = (codes.astype(np.int64) * n_periods + period_codes) * span + t
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+
+    cx = np.concatenate([[0.0], np.cumsum(ev['x'].to_numpy(dtype=np.float64)[order])])
+    cy = np.concatenate([[0.0], np.cumsum(ev['y'].to_numpy(dtype=np.float64)[order])])
+
+    # One row of player details per player code
+    first = np.unique(codes, return_index=True)[1]
+    players = ev.iloc[first][['team_id','team_name','player_id','player_name']].reset_index(drop=True)
+    player_codes = np.arange(len(players), dtype=np.int64)
+
+    start = np.clip(np.array([w['start'] for w in windows], dtype=np.int64), 0, span - 1)
+    end = np.clip(np.array([w['end'] for w in windows], dtype=np.int64), 0, span - 1)
+    in_period = np.array([[w.get('period') is None or p in w['period'] for p in periods] for w in windows])
+
+    count = np.zeros((len(windows), len(players)), dtype=np.int64)
+    sum_x = np.zeros((len(windows), len(players)))
+    sum_y = np.zeros((len(windows), len(players)))
+
+    for k in range(n_periods):
+        base = (player_codes * n_periods + k) * span
+        lo = np.searchsorted(key, base[None,:] + start[:,None], side='left')
+        hi = np.searchsorted(key, base[None,:] + end[:,None], side='left')
+        use = in_period[:, k][:,None]
+
+        count += np.where(use, hi - lo, 0)
+        sum_x += np.where(use, cx[hi] - cx[lo], 0)
+        sum_y += np.where(use, cy[hi] - cy[lo], 0)
+
+    player_teams = players['team_id'].to_numpy()
+    team_match = np.array([[w.get('team_id') is None or team == w['team_id'] for team in player_teams] for w in windows])
+
+    w_idx, p_idx = np.nonzero((count > 0) & team_match)
+
+    df = players.iloc[p_idx].reset_index(drop=True)
+    df.insert(0, 'window', w_idx)
+    df.insert(1, 'label', [windows[w].get('label', f"{clock(windows[w]['start'])}-{clock(windows[w]['end'])}") for w in w_idx])
+    df.insert(2, 'start', [windows[w]['start'] for w in w_idx])
+    df.insert(3, 'end', [windows[w]['end'] for w in w_idx])
+    df['count'] = count[w_idx, p_idx]
+    df['x'] = sum_x[w_idx, p_idx] / df['count']
+    df['y'] = sum_y[w_idx, p_idx] / df['count']
+
+    return df[POSITION_COLUMNS]
@@ -0,0 +1,166 @@
+import os
+import csv
+import json
+import uuid
+import random
+
+COLOUR_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'color-coding-teams.csv')
+
+POSITIONS = ['Goalkeeper', 'Right Back', 'Right Center Back', 'Left Center Back', 'Left Back', 'Right Midfield',
+             'Right Center Midfield', 'Left Center Midfield', 'Left Midfield', 'Right Center Forward', 'Left Center Forward']
+
+
+def _team_names():
+    """
+    Team names from the colour table, so the plotting methods can colour synthetic teams
+    """
+    with open(COLOUR_CSV, encoding='latin1', newline='') as f:
+        return [row['name'] for row in csv.DictReader(f)]
+
+
+def _player(team_id, i):
+    return {'id': team_id * 1000 + i, 'name': f'Player {team_id}-{i}'}
+
+
+def _location(rnd):
+    return [round(rnd.uniform(0, 120), 1), round(rnd.uniform(0, 80), 1)]
+
+
+def _event(rnd, index, period, minute, second, type_id, type_name, team, player=None, position=None):
+    event = {'id': str(uuid.UUID(int=rnd.getrandbits(128))),
+             'index': index,
+             'period': period,
+             'timestamp': f'00:{minute % 45:02d}:{second:02d}.000',
+             'minute': minute,
+             'second': second,
+             'type': {'id': type_id, 'name': type_name},
+             'possession': index // 5 + 1,
+             'possession_team': {'id': team['id'], 'name': team['name']},
+             'play_pattern': {'id': 1, 'name': 'Regular Play'},
+             'team': {'id': team['id'], 'name': team['name']}}
+
+    if player is not None:
+        event['player'] = player
+        event['position'] = position
+        event['location'] = _location(rnd)
+
+    return event
+
+
+def generate_match_events(rnd, home, away, events_per_match=3000, substitutions=3):
+    """
+    Build the event list of one match: Starting XIs, then passes, carries, pressures and shots with locations, then substitutions
+    """
+    squads = {}
+    events = []
+
+    for team in [home, away]:
+        squad = [_player(team['id'], i) for i in range(11 + substitutions)]
+        squads[team['id']] = squad
+        events.append({**_event(rnd, len(events) + 1, 1, 0, 0, 35, 'Starting XI', team),
+                       'tactics': {'formation': 442,
+                                   'lineup': [{'player': squad[i], 'position': {'id': i + 1, 'name': POSITIONS[i]}, 'jersey_number': i + 1}
+                                              for i in range(11)]}})
+
+    # Substitutions happen during the second half, players coming on take over the position of the player going off
+    on_pitch = {team['id']: {i: squads[team['id']][i] for i in range(11)} for team in [home, away]}
+    sub_times = sorted((rnd.randint(50 * 60, 88 * 60), team['id'], k) for team in [home, away] for k in range(substitutions))
+    teams = {home['id']: home, away['id']: away}
+
+    for i in range(events_per_match):
+        clock = int(i * 95 * 60 / events_per_match)
+        minute, second = clock // 60, clock % 60
+        period = 1 if minute < 45 else 2
+
+        while sub_times and sub_times[0][0] <= clock:
+            _, team_id, k = sub_times.pop(0)
+            slot = 10 - k
+            off, on = on_pitch[team_id][slot], squads[team_id][11 + k]
+            event = _event(rnd, len(events) + 1, 2, minute, second, 19, 'Substitution', teams[team_id], off,
+                           {'id': slot + 1, 'name': POSITIONS[slot]})
+            del event['location']
+            event['substitution'] = {'outcome': {'id': 103, 'name': 'Tactical'}, 'replacement': on}
+            events.append(event)
+            on_pitch[team_id][slot] = on
+
+        team = rnd.choice([home, away])
+        slot = rnd.randrange(11)
+        player = on_pitch[team['id']][slot]
+        position = {'id': slot + 1, 'name': POSITIONS[slot]}
+        roll = rnd.random()
+
+        if roll < 0.55:
+            event = _event(rnd, len(events) + 1, period, minute, second, 30, 'Pass', team, player, position)
+            recipient = on_pitch[team['id']][rnd.choice([s for s in range(11) if s != slot])]
+            event['pass'] = {'recipient': recipient, 'length': round(rnd.uniform(3, 50), 1), 'angle': round(rnd.uniform(-3.14, 3.14), 3),
+                             'height': {'id': 1, 'name': 'Ground Pass'}, 'end_location': _location(rnd)}
+            if rnd.random() < 0.2:
+                event['pass']['outcome'] = {'id': 9, 'name': 'Incomplete'}
+        elif roll < 0.85:
+            event = _event(rnd, len(events) + 1, period, minute, second, 43, 'Carry', team, player, position)
+            event['carry'] = {'end_location': _location(rnd)}
+        elif roll < 0.98:
+            event = _event(rnd, len(events) + 1, period, minute, second, 17, 'Pressure', team, player, position)
+            event['under_pressure'] = True
+        else:
+            event = _event(rnd, len(events) + 1, period, minute, second, 16, 'Shot', team, player, position)
+            goal = rnd.random() < 0.1
+            event['shot'] = {'statsbomb_xg': round(rnd.uniform(0.01, 0.6), 4), 'end_location': [120.0, 40.0, 1.5],
+                             'outcome': {'id': 97, 'name': 'Goal'} if goal else {'id': 100, 'name': 'Saved'}}
+
+        events.append(event)
+
+    return events
+
+
+def generate_dataset(root, matches=20, events_per_match=3000, competitions=1, teams=8, seed=0):
+    """
+    Write a synthetic StatsBomb-style data folder: root/matches/<competition_id>/<season_id>.json and root/events/<match_id>.json
+    matches = number of matches per competition, teams = number of teams per competition
+    Teams are named after those in the colour table (generic names once it runs out)
+    Returns the list of match ids written
+    """
+    rnd = random.Random(seed)
+    names = _team_names()
+
+    if root[-1] != '/':
+        root = root + '/'
+
+    os.makedirs(root + 'events', exist_ok=True)
+    match_ids = []
+
+    for c in range(competitions):
+        competition_id, season_id = 100 + c, 1
+        clubs = [{'id': competition_id * 100 + t,
+                  'name': names[c * teams + t] if c * teams + t < len(names) else f'Team {competition_id}-{t}'}
+                 for t in range(teams)]
+        match_info = []
+
+        for m in range(matches):
+            match_id = competition_id * 100000 + m
+            home, away = rnd.sample(clubs, 2)
+
+            match_info.append({'match_id': match_id,
+                               'match_date': f'2019-{1 + m % 12:02d}-{1 + m % 28:02d}',
+                               'kick_off': '15:00:00.000',
+                               'competition': {'competition_id': competition_id, 'competition_name': f'Competition {competition_id}'},
+                               'season': {'season_id': season_id, 'season_name': '2018/2019'},
+                               'home_team': {'home_team_id': home['id'], 'home_team_name': home['name'],
+                                             'home_team_gender': 'female', 'home_team_group': None},
+                               'away_team': {'away_team_id': away['id'], 'away_team_name': away['name'],
+                                             'away_team_gender': 'female', 'away_team_group': None},
+                               'home_score': rnd.randint(0, 4),
+                               'away_score': rnd.randint(0, 4),
+                               'match_status': 'available',
+                               'last_updated': '2019-06-01T00:00:00.000'})
+
+            with open(f'{root}events/{match_id}.json', 'w', encoding='utf-8') as f:
+                json.dump(generate_match_events(rnd, home, away, events_per_match=events_per_match), f)
+
+            match_ids.append(match_id)
+
+        os.makedirs(f'{root}matches/{competition_id}', exist_ok=True)
+        with open(f'{root}matches/{competition_id}/{season_id}.json', 'w', encoding='utf-8') as f:
+            json.dump(match_info, f)
+
+    return match_ids
@@ -2,6 +2,7 @@ from setuptools import find_packages, setup
 setup(
     name='ehstatsbomb',
     packages=find_packages(),
+    package_data={'ehstatsbomb': ['color-coding-teams.csv']},
     version='0.2.9',
     description='My first attempt at building a Python library. Extracts, parses and performs functions on statsbomb event data.',
     author='Ewan Harris',
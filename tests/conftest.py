@@ -0,0 +1,12 @@
+import pytest
+from ehstatsbomb.synthetic import generate_dataset
+
+
+@pytest.fixture(scope='session')
+def data_dir(tmp_path_factory):
+    """
+    A small synthetic StatsBomb data folder shared by the tests that only read it
+    """
+    root = str(tmp_path_factory.mktemp('data')) + '/'
+    generate_dataset(root, matches=4, events_per_match=1500, competitions=2, teams=4)
+    return root
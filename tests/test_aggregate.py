@@ -0,0 +1,79 @@
+import random
+import pandas as pd
+import pytest
+from ehstatsbomb.ehsb import MyClass
+from ehstatsbomb.aggregate import AggSpec, resolve_specs, map_events
+
+MEAN_SPEC = AggSpec('pass_length', by=['team_id','player_id'],
+                    values={'length': ('pass_length','mean'), 'passes': ('pass_length','count'), 'longest': ('pass_length','max')},
+                    event_types=['Pass'])
+
+SPECS = resolve_specs(['pass_pairs','shots_xg','events_per_type']) + [MEAN_SPEC]
+
+
+@pytest.fixture(scope='module')
+def season(data_dir):
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(data_dir + 'matches/')
+    match_ids = sb._match_info_df['match_id'].tolist()
+    events = pd.concat([sb.get_specific_match(m) for m in match_ids], ignore_index=True)
+    return sb, match_ids, events
+
+
+def _expected(events):
+    """
+    The same aggregates as one pandas groupby over every event of the season
+    """
+    passes = events[events['type_name'] == 'Pass']
+    completed = passes[passes['pass_outcome_name'].isna()]
+    shots = events[events['type_name'] == 'Shot']
+
+    return {'pass_pairs': completed.groupby(['team_id','player_id','pass_recipient_id']).size().rename('passes').reset_index(),
+            'shots_xg': shots.groupby(['team_id','player_id','player_name']).agg(shots=('type_name','count'),
+                                                                                xg=('shot_statsbomb_xg','sum')).reset_index(),
+            'events_per_type': events.groupby(['team_id','team_name','type_name']).size().rename('events').reset_index(),
+            'pass_length': passes.groupby(['team_id','player_id']).agg(length=('pass_length','mean'),
+                                                                       passes=('pass_length','count'),
+                                                                       longest=('pass_length','max')).reset_index()}
+
+
+def _check(result, expected, by):
+    result = result.sort_values(by).reset_index(drop=True)
+    expected = expected.sort_values(by).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result[list(expected.columns)], expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_aggregates_match_a_groupby_over_all_events(season, executor):
+    sb, match_ids, events = season
+    expected = _expected(events)
+
+    results = sb.aggregate(SPECS, workers=2, executor=executor)
+
+    assert list(results) == [spec.name for spec in SPECS]
+    for spec in SPECS:
+        _check(results[spec.name], expected[spec.name], spec.by)
+
+
+def test_merge_order_does_not_matter(season):
+    sb, match_ids, _ = season
+    partials = [map_events(SPECS, sb.get_specific_match(m)) for m in match_ids]
+
+    for spec in SPECS:
+        parts = [p[spec.name] for p in partials]
+
+        # Left to right, shuffled, and as a tree of pairs
+        in_order = None
+        for part in parts:
+            in_order = spec.merge(in_order, part)
+
+        shuffled = None
+        for part in random.Random(1).sample(parts, len(parts)):
+            shuffled = spec.merge(shuffled, part)
+
+        tree = spec.merge(spec.merge(parts[0], parts[1]), spec.merge(parts[2], spec.merge(parts[3], spec.merge(None, parts[4]))))
+        for part in parts[5:]:
+            tree = spec.merge(part, tree)
+
+        for merged in [shuffled, tree]:
+            _check(spec.finalize(merged), spec.finalize(in_order), spec.by)
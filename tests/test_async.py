@@ -0,0 +1,91 @@
+import asyncio
+import pandas as pd
+import pytest
+from ehstatsbomb.ehsb import MyClass
+
+
+@pytest.fixture
+def sb(data_dir):
+    sb = MyClass(workers=2, instrument=True)
+    sb.get_all_match_info(data_dir + 'matches/')
+    sb.reset_stats()
+    yield sb
+    sb.close()
+
+
+def _calls(sb, stage):
+    stats = sb.stats().set_index('stage')
+    return int(stats.loc[stage, 'calls']) if stage in stats.index else 0
+
+
+def test_concurrent_requests_share_one_parse_and_get_their_own_copy(sb):
+    match_id = int(sb._match_info_df['match_id'].iloc[0])
+
+    async def main():
+        return await asyncio.gather(*[sb.aget_specific_match(match_id) for _ in range(8)])
+
+    results = asyncio.run(main())
+
+    assert _calls(sb, 'read') == 1 and _calls(sb, 'json_load') == 1 and _calls(sb, 'json_normalize') == 1
+    assert sb._inflight == {}
+
+    expected = MyClass._open_json_file(f'{sb._root_path}events/{match_id}.json')
+    for df in results:
+        pd.testing.assert_frame_equal(df, expected)
+
+    row = results[0]['location'].first_valid_index()
+    results[0]['location'].loc[row][0] = -999
+    results[0]['tactics_lineup'].iloc[0][0]['jersey_number'] = -1
+
+    assert len({id(df) for df in results}) == len(results)
+    for df in results[1:]:
+        assert df['location'].loc[row][0] != -999
+        assert df['tactics_lineup'].iloc[0][0]['jersey_number'] != -1
+
+    # Later requests are answered from the in-memory cache
+    again = asyncio.run(sb.aget_specific_match(match_id))
+    assert _calls(sb, 'read') == 1
+    pd.testing.assert_frame_equal(again, expected)
+
+
+def test_cancelling_one_caller_does_not_cancel_the_shared_parse(sb):
+    match_id = int(sb._match_info_df['match_id'].iloc[0])
+
+    async def main():
+        callers = [asyncio.ensure_future(sb.aget_specific_match(match_id)) for _ in range(3)]
+
+        # Let every caller join the in-flight parse, then cancel the first
+        while not sb._inflight:
+            await asyncio.sleep(0)
+        shared = next(iter(sb._inflight.values()))
+        await asyncio.sleep(0)
+        assert not shared.done()
+        callers[0].cancel()
+
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        return shared, results
+
+    shared, results = asyncio.run(main())
+
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert not shared.cancelled()
+    assert all(isinstance(df, pd.DataFrame) and len(df) for df in results[1:])
+    assert _calls(sb, 'json_load') == 1
+    assert sb._inflight == {}
+
+
+def test_team_event_data_matches_the_blocking_version(sb):
+    team = sb._match_info_df['home_team_name'].iloc[0]
+    done = []
+
+    events = asyncio.run(sb.aget_team_event_data(team, 'name', progress=lambda *args: done.append(args)))
+
+    pd.testing.assert_frame_equal(events, _blocking(sb, team))
+    assert len(done) == len(sb.get_team_match_ids(team, 'name'))
+    assert sb._inflight == {}
+
+
+def _blocking(sb, team):
+    blocking = MyClass(workers=1)
+    blocking.get_all_match_info(sb._root_path + 'matches/')
+    return blocking.get_team_event_data(team, 'name')
@@ -0,0 +1,126 @@
+import os
+import shutil
+import pandas as pd
+from ehstatsbomb.ehsb import MyClass
+
+
+def _first_match(data_dir):
+    return int(sorted(os.listdir(data_dir + 'events'))[0][:-len('.json')])
+
+
+def test_mutating_a_loaded_match_does_not_change_the_cache(data_dir):
+    sb = MyClass(workers=1)
+    sb._root_path = data_dir
+    match_id = _first_match(data_dir)
+
+    original = sb.get_specific_match(match_id)
+
+    df = sb.get_specific_match(match_id)
+    row = df['location'].first_valid_index()
+    df['location'].loc[row][0] = -999
+    df['tactics_lineup'].iloc[0][0]['jersey_number'] = -1
+    df['type_name'] = 'Changed'
+
+    again = sb.get_specific_match(match_id)
+
+    assert sb.memory_cache_info()['hits'] == 2
+    assert again['location'].loc[row][0] != -999
+    assert again['tactics_lineup'].iloc[0][0]['jersey_number'] != -1
+    pd.testing.assert_frame_equal(again, original)
+
+
+def test_mutating_a_filtered_match_does_not_change_the_cache(data_dir):
+    sb = MyClass(workers=1)
+    sb._root_path = data_dir
+    match_id = _first_match(data_dir)
+
+    sb.get_specific_match(match_id)
+    passes = sb.get_specific_match(match_id, event_types=['Pass'], columns=['pass_end_location'])
+    passes['pass_end_location'].iloc[0][1] = -999
+
+    assert sb.get_specific_match(match_id)['pass_end_location'].dropna().map(lambda v: v[1]).min() >= 0
+
+
+def test_disk_cache_hit_is_identical_to_a_fresh_parse(data_dir, tmp_path):
+    match_id = _first_match(data_dir)
+    fresh = MyClass._open_json_file(f'{data_dir}events/{match_id}.json')
+
+    sb = MyClass(cache_dir=str(tmp_path), cache_size=0, workers=1)
+    sb._root_path = data_dir
+    sb.get_specific_match(match_id)
+    hit = sb.get_specific_match(match_id)
+
+    pd.testing.assert_frame_equal(hit, fresh)
+    assert hit['under_pressure'].value_counts(dropna=False).equals(fresh['under_pressure'].value_counts(dropna=False))
+
+
+def test_warm_cache_parses_every_match_into_the_disk_cache(data_dir, tmp_path):
+    sb = MyClass(cache_dir=str(tmp_path), workers=2)
+    sb._root_path = data_dir
+    done = []
+
+    sb.warm_cache(progress=lambda *args: done.append(args))
+
+    info = sb.cache_info()
+    assert len(done) == len(os.listdir(data_dir + 'events')) == len(info)
+    assert not info['stale'].any()
+    assert sb.memory_cache_info()['entries'] == 0
+
+
+def test_disk_cache_entry_goes_stale_when_the_source_changes(data_dir, tmp_path):
+    root = str(tmp_path / 'data') + '/'
+    shutil.copytree(data_dir, root)
+    match_id = _first_match(root)
+    file_path = f'{root}events/{match_id}.json'
+
+    sb = MyClass(cache_dir=str(tmp_path / 'cache'), cache_size=0, workers=1)
+    sb._root_path = root
+    first = sb.get_specific_match(match_id)
+
+    # Same content, newer mtime: the entry no longer matches its source
+    st = os.stat(file_path)
+    os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert sb.cache_info()['stale'].all()
+
+    again = sb.get_specific_match(match_id)
+    pd.testing.assert_frame_equal(again, first)
+
+    info = sb.cache_info()
+    assert len(info) == 1 and not info['stale'].any()
+
+
+def test_each_source_keeps_its_entries_in_its_own_folder(data_dir, tmp_path):
+    from ehstatsbomb.cache import DiskCache
+
+    cache = DiskCache(str(tmp_path))
+    lineups = DiskCache(str(tmp_path), tag='lineup')
+    paths = [data_dir + 'events/' + f for f in sorted(os.listdir(data_dir + 'events'))[:2]]
+    df = pd.DataFrame({'a': [1, 2]})
+
+    for file_path in paths:
+        cache.put(file_path, df)
+        lineups.put(file_path, df)
+
+    assert len(os.listdir(str(tmp_path))) == 4
+    assert sorted(os.listdir(cache._entry_dir(paths[0]))) == sorted(['source', cache._key(paths[0]) + '.parquet'])
+    assert cache.info()['source'].tolist().count(os.path.abspath(paths[0])) == 2
+
+    lineups.clear()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_concurrent_writes_of_the_same_entry(data_dir, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from ehstatsbomb.cache import DiskCache
+
+    match_id = _first_match(data_dir)
+    file_path = f'{data_dir}events/{match_id}.json'
+    df = MyClass._open_json_file(file_path)
+    cache = DiskCache(str(tmp_path))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: cache.put(file_path, df), range(8)))
+
+    # No temporary files left behind and a single fresh entry
+    assert sorted(os.listdir(cache._entry_dir(file_path))) == sorted(['source', cache._key(file_path) + '.parquet'])
+    pd.testing.assert_frame_equal(cache.get(file_path), df)
@@ -0,0 +1,32 @@
+import pandas as pd
+from ehstatsbomb.ehsb import MyClass
+
+
+def _loaded(data_dir, compact):
+    sb = MyClass(workers=1, compact=compact)
+    sb.get_all_match_info(data_dir + 'matches/')
+    return sb
+
+
+def test_compact_and_plain_loads_give_the_same_positions_and_lineups(data_dir):
+    plain, compact = _loaded(data_dir, False), _loaded(data_dir, True)
+
+    for match_id in plain._match_info_df['match_id']:
+        # Coordinates are float32 in compact frames
+        pd.testing.assert_frame_equal(compact.get_avg_positions(match_id), plain.get_avg_positions(match_id),
+                                      check_dtype=False, atol=1e-4)
+        pd.testing.assert_frame_equal(compact.get_lineup(match_id), plain.get_lineup(match_id))
+        pd.testing.assert_frame_equal(compact.get_starting_xis(match_id), plain.get_starting_xis(match_id))
+
+
+def test_compact_frames_are_smaller_and_typed(data_dir):
+    plain, compact = _loaded(data_dir, False), _loaded(data_dir, True)
+    match_id = plain._match_info_df['match_id'].iloc[0]
+
+    small = compact.get_specific_match(match_id)
+    full = plain.get_specific_match(match_id)
+
+    assert small.memory_usage(deep=True).sum() < full.memory_usage(deep=True).sum() / 2
+    assert str(small['location_x'].dtype) == 'float32' and 'location' not in small.columns
+    assert isinstance(small['type_name'].dtype, pd.CategoricalDtype)
+    assert str(small['player_id'].dtype) == 'Int32'
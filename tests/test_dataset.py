@@ -0,0 +1,78 @@
+import os
+import pytest
+from ehstatsbomb.ehsb import MyClass
+from ehstatsbomb.dataset import EventDataset
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture(scope='module')
+def built(data_dir, tmp_path_factory):
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(data_dir + 'matches/')
+    out_dir = str(tmp_path_factory.mktemp('dataset'))
+    return sb, out_dir, sb.build_event_dataset(out_dir)
+
+
+def _ids(df):
+    return sorted(df['id'])
+
+
+def test_queries_match_filtering_team_event_data(built):
+    sb, out_dir, ds = built
+    team = sb._match_info_df['home_team_name'].iloc[0]
+    team_id = int(sb._match_info_df['home_team_id'].iloc[0])
+
+    events = sb.get_team_event_data(team, 'name')
+    own = events[events['team_name'] == team]
+    player_id = int(own['player_id'].dropna().iloc[0])
+    player_name = own.loc[own['player_id'] == player_id, 'player_name'].iloc[0]
+
+    assert _ids(ds.query(team=team)) == _ids(own)
+    assert _ids(ds.query(team=team_id)) == _ids(own)
+
+    shots_and_passes = own[own['type_name'].isin(['Shot','Pass'])]
+    assert _ids(ds.query(team=team, event_types=['Shot','Pass'])) == _ids(shots_and_passes)
+
+    for player in [player_id, player_name]:
+        assert _ids(ds.query(player=player)) == _ids(events[events['player_id'] == player_id])
+
+    spell = own[own['minute'].between(10, 30)]
+    assert _ids(ds.query(team=team, minute_range=(10, 30))) == _ids(spell)
+
+    # Open from another reader, with only a few columns
+    df = EventDataset(out_dir).query(team=team, event_types=['Shot'], columns=['id','shot_statsbomb_xg'])
+    assert list(df.columns) == ['id','shot_statsbomb_xg']
+    assert df['shot_statsbomb_xg'].sum() == pytest.approx(own.loc[own['type_name'] == 'Shot', 'shot_statsbomb_xg'].sum())
+
+
+def test_query_without_matches_is_empty(built):
+    sb, _, ds = built
+    team = sb._match_info_df['home_team_name'].iloc[0]
+
+    assert ds.query(team='No Such Team').empty
+    assert ds.query(team=team, minute_range=(200, 300)).empty
+    assert ds.query(team=team, event_types=['Pass'], player=-1).empty
+
+
+def test_existing_matches_are_not_converted_again(data_dir, tmp_path):
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(data_dir + 'matches/')
+    match_ids = sb._match_info_df['match_id'].tolist()
+    out_dir = str(tmp_path)
+
+    sb.build_event_dataset(out_dir, match_ids=match_ids[:3])
+    existing = EventDataset(out_dir).matches()
+    files = {m: f'{out_dir}/{f}' for m, f in zip(existing['match_id'], existing['file'])}
+    mtimes = {m: os.stat(f).st_mtime_ns for m, f in files.items()}
+
+    converted = []
+    ds = sb.build_event_dataset(out_dir, progress=lambda done, total, match_id: converted.append(match_id))
+
+    assert converted == match_ids[3:]
+    assert len(ds) == len(match_ids)
+    assert {m: os.stat(f).st_mtime_ns for m, f in files.items()} == mtimes
+
+    converted = []
+    sb.build_event_dataset(out_dir, match_ids=match_ids[:1], overwrite=True, progress=lambda *args: converted.append(args[2]))
+    assert converted == match_ids[:1]
@@ -0,0 +1,127 @@
+import json
+import shutil
+import pytest
+from ehstatsbomb.ehsb import MyClass
+
+
+@pytest.fixture
+def swapped(data_dir, tmp_path):
+    """
+    A copy of the data where the first match's away Starting XI comes first and a home starter is sent off at 70:00
+    """
+    root = str(tmp_path / 'data') + '/'
+    shutil.copytree(data_dir, root)
+
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(root + 'matches/')
+    info = sb._match_info_df.iloc[0]
+    match_id, home_team_id = int(info['match_id']), int(info['home_team_id'])
+
+    file_path = f'{root}events/{match_id}.json'
+    with open(file_path, encoding='utf-8') as f:
+        events = json.load(f)
+
+    events[0], events[1] = events[1], events[0]
+    assert events[1]['team']['id'] == home_team_id
+
+    sent_off = events[1]['tactics']['lineup'][3]['player']
+    events.append({'id': 'red-card', 'index': len(events) + 1, 'period': 2, 'timestamp': '00:25:00.000', 'minute': 70, 'second': 0,
+                   'type': {'id': 24, 'name': 'Bad Behaviour'}, 'team': events[1]['team'], 'player': sent_off,
+                   'bad_behaviour': {'card': {'id': 5, 'name': 'Red Card'}}})
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(events, f)
+
+    return root, match_id, home_team_id, sent_off['id']
+
+
+def test_home_and_away_come_from_match_info(swapped):
+    root, match_id, home_team_id, _ = swapped
+
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(root + 'matches/')
+    lineup = sb.get_lineup(match_id)
+
+    assert set(lineup.loc[lineup['team'] == 'home', 'team_id']) == {home_team_id}
+    assert set(sb.get_starting_xis(match_id, ha='Home', form='dic')) == \
+        set(lineup.loc[lineup['starter'] & (lineup['team_id'] == home_team_id), 'player_id'])
+
+
+def test_string_match_ids_get_the_same_home_and_away(swapped):
+    root, match_id, home_team_id, _ = swapped
+
+    for order in [[str(match_id), match_id], [match_id, str(match_id)]]:
+        sb = MyClass(workers=1)
+        sb.get_all_match_info(root + 'matches/')
+
+        for m in order:
+            positions = sb.get_avg_positions(m)
+            assert set(positions.loc[positions['team'] == 'home', 'team_id']) == {home_team_id}
+
+            lineup = sb.get_lineup(m)
+            assert set(lineup.loc[lineup['team'] == 'home', 'team_id']) == {home_team_id}
+            assert (lineup['match_id'] == match_id).all()
+
+
+def test_substitutes_and_sending_off(swapped):
+    root, match_id, _, sent_off = swapped
+
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(root + 'matches/')
+    lineup = sb.get_lineup(match_id).set_index('player_id')
+    events = sb.get_specific_match(match_id)
+    subs = events[events['type_name'] == 'Substitution']
+
+    assert (~lineup['starter']).sum() == len(subs)
+    assert lineup['starter'].sum() == 22
+
+    for sub in subs.itertuples():
+        time = sub.minute * 60 + sub.second
+        assert lineup.loc[sub.player_id, 'off_time'] == time
+        assert lineup.loc[sub.substitution_replacement_id, 'on_time'] == time
+
+    assert lineup.loc[sent_off, 'off_time'] == 70 * 60
+    assert lineup.loc[sent_off, 'minutes'] == 70
+    assert sb.get_player_teams(match_id) == lineup['team_id'].to_dict()
+
+
+def test_minutes_played_adds_up_over_matches(data_dir):
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(data_dir + 'matches/')
+    team = sb._match_info_df['home_team_name'].iloc[0]
+
+    minutes = sb.get_minutes_played(team, 'name')
+    lineups = sb.get_lineups(sb.get_team_match_ids(team, 'name'))
+    lineups = lineups[lineups['team_name'] == team]
+
+    assert minutes['minutes'].sum() == pytest.approx(lineups['minutes'].sum())
+    assert minutes['starts'].sum() == 11 * len(sb.get_team_match_ids(team, 'name'))
+
+
+def test_lineups_are_persisted_in_the_cache_dir(data_dir, tmp_path):
+    sb = MyClass(cache_dir=str(tmp_path), workers=1, instrument=True)
+    sb.get_all_match_info(data_dir + 'matches/')
+    first = sb.get_lineups()
+
+    sb = MyClass(cache_dir=str(tmp_path), workers=1, instrument=True)
+    sb.get_all_match_info(data_dir + 'matches/')
+    sb.reset_stats()
+
+    assert sb.get_lineups().equals(first)
+    assert 'json_load' not in sb.stats()['stage'].tolist()
+
+
+def test_process_and_thread_rendering_agree_on_home_and_away(swapped, tmp_path):
+    from matplotlib.image import imread
+
+    root, match_id, _, _ = swapped
+
+    sb = MyClass(workers=2)
+    sb.get_all_match_info(root + 'matches/')
+
+    files = {}
+    for executor, m in [('thread', match_id), ('process', str(match_id))]:
+        out_dir = str(tmp_path / executor)
+        files[executor] = sb.render_match_plots([m], out_dir, kind='positions', executor=executor)[0]
+
+    assert (imread(files['thread']) == imread(files['process'])).all()
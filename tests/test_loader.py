@@ -0,0 +1,66 @@
+import os
+import time
+import pandas as pd
+from ehstatsbomb.ehsb import MyClass
+from ehstatsbomb.loader import filter_events
+from ehstatsbomb.lineups import LINEUP_EVENT_COLUMNS
+from ehstatsbomb.network import NETWORK_COLUMNS
+
+
+def test_pruned_load_matches_filtered_full_load(data_dir):
+    file_path = data_dir + 'events/' + sorted(os.listdir(data_dir + 'events'))[0]
+    full = MyClass._open_json_file(file_path)
+
+    for event_types, columns in [(None, LINEUP_EVENT_COLUMNS), (['Pass'], NETWORK_COLUMNS)]:
+        pruned = MyClass._open_json_file(file_path, event_types=event_types, columns=columns)
+        pd.testing.assert_frame_equal(pruned, filter_events(full, event_types, columns), check_dtype=False)
+
+
+def _slow_square(x):
+    # Later items finish first, so results come back out of order
+    time.sleep(0.02 * (5 - x))
+    return x * x
+
+
+def test_pool_map_keeps_input_order_and_reports_each_item():
+    from ehstatsbomb.loader import pool_map
+
+    items = list(range(6))
+
+    for workers, executor in [(1, 'thread'), (3, 'thread'), (3, 'process')]:
+        calls = []
+        results = pool_map(_slow_square, items, workers=workers, executor=executor, progress=lambda *args: calls.append(args))
+
+        assert results == [x * x for x in items]
+        assert [done for done, _, _ in calls] == list(range(1, len(items) + 1))
+        assert {total for _, total, _ in calls} == {len(items)}
+        assert sorted(item for _, _, item in calls) == items
+
+
+def test_prefetch_iter_only_runs_prefetch_items_ahead():
+    from ehstatsbomb.loader import prefetch_iter
+
+    for prefetch in [1, 2]:
+        started = []
+
+        def func(item):
+            started.append(item)
+            return item
+
+        for item, result in prefetch_iter(func, range(6), prefetch=prefetch):
+            time.sleep(0.01)
+            assert result == item
+            assert max(started) <= item + prefetch
+
+
+def test_iter_matches_does_not_fill_the_memory_cache(data_dir):
+    sb = MyClass(workers=1)
+    sb._root_path = data_dir
+    match_ids = [int(f[:-len('.json')]) for f in sorted(os.listdir(data_dir + 'events'))]
+
+    sb.get_specific_match(match_ids[0])
+    loaded = [match_id for match_id, events in sb.iter_matches(match_ids)]
+
+    assert loaded == match_ids
+    assert sb.memory_cache_info()['entries'] == 1
+    assert sb.memory_cache_info()['hits'] == 1
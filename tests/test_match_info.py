@@ -0,0 +1,207 @@
+import os
+import json
+import shutil
+import pytest
+import pandas as pd
+from ehstatsbomb.ehsb import MyClass
+
+
+@pytest.fixture
+def corpus(data_dir, tmp_path):
+    root = str(tmp_path / 'data') + '/'
+    shutil.copytree(data_dir, root)
+    return root, str(tmp_path / 'state') + '/'
+
+
+def _refresh(root, state_dir):
+    sb = MyClass(workers=1)
+    parsed = []
+    rows = sb.refresh_match_info(root + 'matches/', state_dir, progress=lambda done, total, path: parsed.append(path))
+    return sb, rows, parsed
+
+
+def _match_ids(sb):
+    return sorted(sb._match_info_df['match_id'].tolist())
+
+
+def _edit(file_path, func):
+    with open(file_path, encoding='utf-8') as f:
+        matches = json.load(f)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(func(matches), f)
+
+
+def test_first_refresh_ingests_everything(corpus):
+    root, state_dir = corpus
+
+    sb, rows, parsed = _refresh(root, state_dir)
+    full = MyClass(workers=1).get_all_match_info(root + 'matches/')
+
+    assert len(parsed) == 2
+    assert sorted(rows['match_id']) == _match_ids(sb) == sorted(full['match_id'])
+    assert os.path.exists(state_dir + 'match_manifest.json')
+
+
+def test_unchanged_and_touched_files_are_not_parsed(corpus):
+    root, state_dir = corpus
+    first, _, _ = _refresh(root, state_dir)
+
+    sb, rows, parsed = _refresh(root, state_dir)
+    assert parsed == [] and rows.empty
+    assert _match_ids(sb) == _match_ids(first)
+
+    # A new mtime with the same contents is recognised by its hash, and the manifest takes the new mtime
+    file_path = root + 'matches/100/1.json'
+    st = os.stat(file_path)
+    os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    sb, rows, parsed = _refresh(root, state_dir)
+    assert parsed == [] and rows.empty
+    assert _match_ids(sb) == _match_ids(first)
+
+    with open(state_dir + 'match_manifest.json', encoding='utf-8') as f:
+        assert json.load(f)['100/1.json']['mtime_ns'] == os.stat(file_path).st_mtime_ns
+
+
+def test_changed_file_is_upserted_and_its_dropped_matches_removed(corpus):
+    root, state_dir = corpus
+    first, _, _ = _refresh(root, state_dir)
+    file_path = root + 'matches/100/1.json'
+
+    with open(file_path, encoding='utf-8') as f:
+        matches = json.load(f)
+    updated, dropped = matches[0]['match_id'], matches[-1]['match_id']
+
+    def change(matches):
+        matches[0]['home_score'] = 9
+        return matches[:-1]
+
+    _edit(file_path, change)
+
+    sb, rows, parsed = _refresh(root, state_dir)
+
+    assert parsed == [file_path]
+    assert sorted(rows['match_id']) == sorted(m['match_id'] for m in matches[:-1])
+    assert _match_ids(sb) == sorted(set(_match_ids(first)) - {dropped})
+    assert sb._match_info_df.set_index('match_id').loc[updated, 'home_score'] == 9
+    assert dropped not in sb.find_matches(competition=100)['match_id'].tolist()
+
+    # The next run starts from the persisted table and sees the same thing
+    sb, rows, parsed = _refresh(root, state_dir)
+    assert parsed == [] and _match_ids(sb) == sorted(set(_match_ids(first)) - {dropped})
+    assert sb._match_info_df.set_index('match_id').loc[updated, 'home_score'] == 9
+
+
+def test_removed_file_drops_its_matches(corpus):
+    root, state_dir = corpus
+    first, _, _ = _refresh(root, state_dir)
+
+    with open(root + 'matches/101/1.json', encoding='utf-8') as f:
+        removed = {m['match_id'] for m in json.load(f)}
+    shutil.rmtree(root + 'matches/101')
+
+    sb, rows, parsed = _refresh(root, state_dir)
+
+    assert parsed == [] and rows.empty
+    assert _match_ids(sb) == sorted(set(_match_ids(first)) - removed)
+    assert sb.find_matches(competition=101).empty
+
+    with open(state_dir + 'match_manifest.json', encoding='utf-8') as f:
+        assert list(json.load(f)) == ['100/1.json']
+
+    sb, _, _ = _refresh(root, state_dir)
+    assert _match_ids(sb) == sorted(set(_match_ids(first)) - removed)
+
+
+def _scan(df, team=None, competition=None, season=None, date_from=None, date_to=None):
+    """
+    The boolean-mask scan get_team_match_ids used to do, over the whole table
+    """
+    mask = pd.Series(True, index=df.index)
+    if team is not None:
+        kind = 'name' if isinstance(team, str) else 'id'
+        mask &= (df[f'home_team_{kind}'] == team) | (df[f'away_team_{kind}'] == team)
+    for prefix, value in [('competition', competition), ('season', season)]:
+        if value is not None:
+            mask &= df[prefix + ('_name' if isinstance(value, str) else '_id')] == value
+    if date_from is not None:
+        mask &= df['match_date'] >= date_from
+    if date_to is not None:
+        mask &= df['match_date'] <= date_to
+    return df.loc[mask, 'match_id'].tolist()
+
+
+def test_index_lookups_agree_with_a_full_scan(data_dir):
+    sb = MyClass(workers=1)
+
+    # Folders added one at a time, then everything again, update the index incrementally
+    sb.get_all_match_info(data_dir + 'matches/', folders=[101])
+    sb.get_all_match_info(data_dir + 'matches/', folders=[100])
+    sb.get_all_match_info(data_dir + 'matches/')
+    sb.get_all_match_info(data_dir + 'matches/')
+
+    df = sb._match_info_df
+    full = MyClass(workers=1).get_all_match_info(data_dir + 'matches/')
+    assert sorted(df['match_id']) == sorted(full['match_id'])
+
+    teams = sorted(set(df['home_team_name']) | set(df['away_team_name']))
+    team_ids = sorted(set(df['home_team_id']) | set(df['away_team_id']))
+
+    for team in teams:
+        assert sb.get_team_match_ids(team, 'name') == _scan(df, team=team)
+    for team_id in team_ids:
+        assert sb.get_team_match_ids(team_id, 'id') == _scan(df, team=team_id)
+
+    queries = [{'competition': 100}, {'competition': 'Competition 101'}, {'season': '2018/2019', 'competition': 101},
+               {'team': teams[0], 'season': 1}, {'date_from': '2019-02-02'}, {'date_to': '2019-02-02'},
+               {'date_from': '2019-02-01', 'date_to': '2019-03-03', 'competition': 100},
+               {'date_from': '2019-12-01'}, {'team': 'No Such Team'}]
+
+    for query in queries:
+        assert sb.find_matches(**query)['match_id'].tolist() == _scan(df, **query)
+
+
+@pytest.mark.parametrize('same_run', [True, False])
+def test_match_moved_to_another_file_is_kept(corpus, same_run):
+    root, state_dir = corpus
+    first, _, _ = _refresh(root, state_dir)
+
+    with open(root + 'matches/100/1.json', encoding='utf-8') as f:
+        moved = json.load(f)[-1]
+
+    _edit(root + 'matches/101/1.json', lambda matches: matches + [moved])
+    if not same_run:
+        _refresh(root, state_dir)
+    _edit(root + 'matches/100/1.json', lambda matches: matches[:-1])
+
+    sb, _, _ = _refresh(root, state_dir)
+    full = MyClass(workers=1).get_all_match_info(root + 'matches/')
+
+    assert _match_ids(sb) == _match_ids(first) == sorted(full['match_id'])
+    assert moved['match_id'] in sb.find_matches(competition=100)['match_id'].tolist()
+
+    sb, _, _ = _refresh(root, state_dir)
+    assert _match_ids(sb) == _match_ids(first)
+
+
+def test_reloaded_table_matches_a_fresh_load(corpus):
+    root, state_dir = corpus
+
+    def add_managers(matches):
+        for m in matches:
+            for side in ['home_team', 'away_team']:
+                m[side]['managers'] = [{'id': m[side][side + '_id'], 'name': 'Manager', 'country': {'id': 68, 'name': 'England'}}]
+        return matches
+
+    _edit(root + 'matches/100/1.json', add_managers)
+    _refresh(root, state_dir)
+
+    sb, _, _ = _refresh(root, state_dir)
+    full = MyClass(workers=1).get_all_match_info(root + 'matches/')
+
+    def tidy(df):
+        return df.sort_values('match_id').reset_index(drop=True)[sorted(df.columns)]
+
+    reloaded = tidy(sb._match_info_df)
+    assert isinstance(reloaded['home_team_managers'].dropna().iloc[0], list)
+    pd.testing.assert_frame_equal(reloaded, tidy(full))
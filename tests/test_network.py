@@ -0,0 +1,60 @@
+from collections import Counter
+import numpy as np
+import pytest
+from ehstatsbomb.ehsb import MyClass
+from ehstatsbomb.compact import compact_events
+from ehstatsbomb.network import passing_network
+
+
+def _brute_force(events, successful_only=True):
+    directed = Counter()
+    for e in events[events['type_name'] == 'Pass'].itertuples():
+        if successful_only and isinstance(e.pass_outcome_name, str):
+            continue
+        directed[(int(e.player_id), int(e.pass_recipient_id))] += 1
+
+    undirected = Counter()
+    for (a, b), count in directed.items():
+        undirected[(min(a, b), max(a, b))] += count
+
+    return directed, undirected
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('successful_only', [True, False])
+def test_passing_network_matches_a_brute_force_count(data_dir, compact, successful_only):
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(data_dir + 'matches/')
+    match_id = int(sb._match_info_df['match_id'].iloc[0])
+    events = sb.get_specific_match(match_id)
+    directed, undirected = _brute_force(events, successful_only)
+
+    network = passing_network(compact_events(events) if compact else events, successful_only=successful_only)
+
+    edges = {(int(a), int(b)): c for a, b, c in zip(network.edges['player_id'], network.edges['pass_recipient_id'], network.edges['count'])}
+    pairs = {(int(a), int(b)): c for a, b, c in zip(network.pairs['player_id'], network.pairs['pass_recipient_id'], network.pairs['count'])}
+    assert edges == dict(directed)
+    assert pairs == dict(undirected)
+
+    players = [int(p) for p in network.players.index]
+    matrix = np.zeros((len(players), len(players)), dtype=np.int64)
+    for (a, b), count in directed.items():
+        matrix[players.index(a), players.index(b)] = count
+    assert (network.matrix == matrix).all()
+
+    names = events.dropna(subset=['player_id']).drop_duplicates('player_id').set_index('player_id')['player_name']
+    assert all(network.players.loc[p, 'player_name'] == names[p] for p in network.players.index)
+
+
+def test_get_passing_networks_agrees_with_get_passing_network(data_dir):
+    sb = MyClass(workers=1, compact=True)
+    sb.get_all_match_info(data_dir + 'matches/')
+    match_ids = sb._match_info_df['match_id'].tolist()
+
+    networks = sb.get_passing_networks(match_ids)
+
+    assert list(networks) == match_ids
+    for match_id in match_ids:
+        single = sb.get_passing_network(match_id)
+        assert networks[match_id].pairs.equals(single.pairs)
+        assert (networks[match_id].matrix == single.matrix).all()
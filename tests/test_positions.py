@@ -0,0 +1,76 @@
+import pytest
+from ehstatsbomb.ehsb import MyClass
+
+
+@pytest.fixture
+def match(data_dir):
+    sb = MyClass(workers=1)
+    sb.get_all_match_info(data_dir + 'matches/')
+    match_id = int(sb._match_info_df['match_id'].iloc[0])
+    return sb, match_id, sb._position_events(match_id).dropna(subset=['player_id','x','y'])
+
+
+def _brute_force(events, start, end, periods=None, team_id=None):
+    ev = events[(events['time_ticker'] >= start) & (events['time_ticker'] < end)]
+    if periods is not None:
+        ev = ev[ev['period'].isin(periods)]
+    if team_id is not None:
+        ev = ev[ev['team_id'] == team_id]
+    return ev.groupby('player_id').agg(x=('x','mean'), y=('y','mean'), count=('x','size'))
+
+
+def _check(result, expected):
+    result = result.set_index('player_id').sort_index()
+    assert list(result.index) == list(expected.index)
+    assert (result['count'] == expected['count']).all()
+    assert result['x'].to_numpy() == pytest.approx(expected['x'].to_numpy())
+    assert result['y'].to_numpy() == pytest.approx(expected['y'].to_numpy())
+
+
+def test_custom_windows_match_a_brute_force_mean(match):
+    sb, match_id, events = match
+
+    windows = [(0, 15), (10, 50), (44.5, 46), (80, 200)]
+    df = sb.get_windowed_positions(match_id, windows=windows)
+
+    for i, (start, end) in enumerate(windows):
+        _check(df[df['window'] == i], _brute_force(events, start * 60, end * 60))
+
+
+def test_halves_and_rolling_windows(match):
+    sb, match_id, events = match
+
+    halves = sb.get_windowed_positions(match_id, windows='halves')
+    for i, period in enumerate(sorted(events['period'].unique())):
+        _check(halves[halves['window'] == i], _brute_force(events, 0, 10**6, periods=[period]))
+
+    rolling = sb.get_windowed_positions(match_id, windows='rolling', minutes=20, step=10)
+    for i, start in enumerate(range(0, int(events['time_ticker'].max()) + 1, 600)):
+        _check(rolling[rolling['window'] == i], _brute_force(events, start, start + 1200))
+
+
+def test_substitution_windows_split_at_each_substitution(match):
+    sb, match_id, events = match
+
+    df = sb.get_windowed_positions(match_id, windows='substitutions')
+    lineup = sb.get_lineup(match_id)
+
+    for team_id, team in df.groupby('team_id'):
+        sub_times = sorted(set(lineup.loc[~lineup['starter'] & (lineup['team_id'] == team_id), 'on_time']))
+        assert sorted(team['start'].unique()) == [0] + sub_times
+
+        for (start, end), window in team.groupby(['start','end']):
+            _check(window, _brute_force(events, start, end, team_id=team_id))
+
+
+def test_avg_positions_stop_at_the_first_substitution(match):
+    sb, match_id, events = match
+
+    df = sb.get_avg_positions(match_id)
+    lineup = sb.get_lineup(match_id)
+
+    assert len(df) == 22
+    for team_id, team in df.groupby('team_id'):
+        first_sub = lineup.loc[~lineup['starter'] & (lineup['team_id'] == team_id), 'on_time'].min()
+        expected = _brute_force(events, 0, first_sub, team_id=team_id).loc[team['player_id']]
+        assert team['x'].to_numpy() == pytest.approx(expected['x'].to_numpy())